@@ -0,0 +1,527 @@
+"""Benchmarks for system-events-functions.py.
+
+Run "python system-events-benchmark.py startup" to check that the commands
+that do not plot start within a time budget (tests/test_import.py checks that
+importing the module has no side effects).
+
+Run "python system-events-benchmark.py suite --lines 1m" to time every
+analysis on a generated log of that size and save the wall time, peak RSS
+and lines per second of each to JSON; "compare" reports the differences
+between two such files (e.g. from two commits).
+"""
+from argparse import ArgumentParser
+import contextlib
+from datetime import date, timedelta
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "system-events-functions.py")
+SAMPLE_LOG = os.path.join(os.path.dirname(MODULE_PATH),
+                          "spring2024_system_events.txt")
+BENCHMARK_PATH = os.path.abspath(__file__)
+LINE_COUNTS = {"10k": 10_000, "1m": 1_000_000, "100m": 100_000_000}
+# the generated logs cover the same months as the sample log
+GENERATED_SPAN_DAYS = 120
+APPENDED_EVENTS = 1000
+
+# name -> (command line arguments after the script, stdin); "{log}" is
+# replaced by a scratch copy of the sample log
+STARTUP_COMMANDS = {
+    "help": (["--help"], ""),
+    "summary (streaming)": (["--streaming", "{log}", "summary"], ""),
+    "activity (streaming)": (["--streaming", "{log}", "activity"], ""),
+    "search": (["{log}", "search", "Error", "game"], ""),
+    "sequences": (["{log}", "sequences"], ""),
+    "warning-patterns": (["{log}", "warning-patterns"], ""),
+    "add": (["{log}", "add", "--format", "jsonl", "--change-log",
+             "{change_log}"],
+            json.dumps({"date": "05012024", "time": "1200",
+                        "category": "Update", "priority": "Low",
+                        "description": "Benchmark event",
+                        "user_name": "benchmark"}) + "\n"),
+}
+
+
+def time_command(arguments, stdin_text, repeat):
+    """Runs the CLI several times and returns the median wall time.
+
+    Args:
+        arguments (list of str): arguments after the script name.
+        stdin_text (str): text sent to the command's stdin.
+        repeat (int): number of runs.
+
+    Raises:
+        RuntimeError: If the command fails.
+
+    Returns:
+        float: median wall time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, MODULE_PATH] + arguments, input=stdin_text,
+            capture_output=True, text=True
+        )
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"{' '.join(arguments)} failed:\n{result.stderr}"
+            )
+    return statistics.median(timings)
+
+
+def check_startup(budget_ms, repeat):
+    """Times every command in STARTUP_COMMANDS against the budget.
+
+    Args:
+        budget_ms (float): maximum median startup time in milliseconds.
+        repeat (int): number of runs per command.
+
+    Returns:
+        bool: True if every command is within the budget.
+    """
+    passed = True
+
+    with tempfile.TemporaryDirectory() as scratch:
+        paths = {"log": os.path.join(scratch, "events.txt"),
+                 "change_log": os.path.join(scratch, "change_log.txt")}
+        shutil.copy(SAMPLE_LOG, paths["log"])
+
+        for name, (arguments, stdin_text) in STARTUP_COMMANDS.items():
+            arguments = [argument.format(**paths) for argument in arguments]
+            try:
+                elapsed_ms = time_command(arguments, stdin_text,
+                                          repeat) * 1000
+            except RuntimeError as error:
+                print(f"FAIL {name:20} {error}")
+                passed = False
+                continue
+            status = "ok" if elapsed_ms <= budget_ms else "FAIL"
+            print(f"{status:4} {name:20} {elapsed_ms:8.1f} ms "
+                  f"(budget {budget_ms:.0f} ms)")
+            passed = passed and elapsed_ms <= budget_ms
+    return passed
+
+
+def load_module():
+    """Imports system-events-functions.py (its file name is not a valid
+    module name) and returns it."""
+    spec = importlib.util.spec_from_file_location("system_events",
+                                                  MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # registered first, so the worker processes of --workers can unpickle
+    # the module's functions by name
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def sample_vocabulary(path=SAMPLE_LOG):
+    """Returns the (category, description) pairs of a log and how often
+    each occurs.
+
+    Returns:
+        tuple: (list of (category, description) pairs, list of counts).
+    """
+    counts = {}
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            parts = [part.strip() for part in line.split(" | ", 3)]
+            if len(parts) == 4:
+                pair = (parts[1], parts[3])
+                counts[pair] = counts.get(pair, 0) + 1
+    return list(counts), list(counts.values())
+
+
+def generate_log(path, lines, seed=0, span_days=GENERATED_SPAN_DAYS):
+    """Writes a synthetic system events log in the format of the sample
+    log. Categories and descriptions are drawn with the frequencies they
+    have in the sample, event IDs are numbered from ID001 and timestamps
+    increase over span_days days from 2024-01-01. The same seed always
+    gives the same file.
+
+    Args:
+        path (str): file to write.
+        lines (int): number of events.
+        seed (int, optional): seed of the random generator. Default is 0.
+        span_days (int, optional): number of days the events cover.
+    """
+    rng = random.Random(seed)
+    pairs, weights = sample_vocabulary()
+    mean_gap = span_days * 86400 / max(lines, 1)
+    first_day = date(2024, 1, 1)
+    day_texts = {}
+    seconds = 0.0
+    number = 1
+    batch_size = 100_000
+
+    with open(path, "w", encoding="utf-8") as file:
+        while number <= lines:
+            batch = rng.choices(pairs, weights, k=min(batch_size,
+                                                      lines - number + 1))
+            rows = []
+            for category, description in batch:
+                seconds += rng.random() * 2 * mean_gap
+                day, second = divmod(int(seconds), 86400)
+                day_text = day_texts.get(day)
+                if day_text is None:
+                    day_text = (first_day + timedelta(days=day)).isoformat()
+                    day_texts[day] = day_text
+                hour, second = divmod(second, 3600)
+                minute, second = divmod(second, 60)
+                rows.append(f"{day_text} {hour:02d}:{minute:02d}:"
+                            f"{second:02d} | {category} | ID{number:03d} | "
+                            f"{description}\n")
+                number += 1
+            file.writelines(rows)
+
+
+def appended_events(module, count, seed=0):
+    """Returns count events to add with SystemEventsManager.add_events(),
+    drawn from the sample's events in the categories it accepts."""
+    rng = random.Random(seed)
+    pairs, weights = zip(*[
+        (pair, weight) for pair, weight in zip(*sample_vocabulary())
+        if pair[0] in module.EVENT_CATEGORIES
+    ])
+    return [{"date": "05012024", "time": "1200", "category": category,
+             "priority": "Low", "description": description,
+             "user_name": "benchmark"}
+            for category, description in rng.choices(pairs, weights,
+                                                      k=count)]
+
+
+def time_summary(module, manager, path):
+    manager.event_type_counts(path, module.SUMMARY_EVENTS)
+
+
+def time_activity(module, manager, path):
+    manager.month_counts(path)
+
+
+def time_extract_date_time(module, manager, path):
+    manager.extract_date_time(path)
+
+
+def time_extract_timestamps(module, manager, path):
+    manager.extract_date_time(path, quiet=True, as_array=True)
+
+
+def time_keyword_search(module, manager, path):
+    for _ in manager.search_events(path, "Error", "game"):
+        pass
+
+
+def time_id_warning_patterns(module, manager, path):
+    manager.id_warning_patterns(path)
+
+
+def time_event_sequence(module, manager, path):
+    manager.event_sequence(path, quiet=True)
+
+
+def time_render_reports(module, manager, path):
+    manager.render_reports([path], path + ".reports", ("png", "svg"))
+
+
+def time_append(module, manager, path):
+    change_log = os.path.join(os.path.dirname(path), "change_log.txt")
+    events = appended_events(module, APPENDED_EVENTS)
+    return len(manager.add_events(path, events, change_log))
+
+
+# name -> function(module, manager, log path) that runs one analysis the
+# way the menu or the command line does, without the prompts; it returns
+# the number of lines it processed, or None for every line of the log
+BENCHMARK_CASES = {
+    "summary": time_summary,
+    "activity": time_activity,
+    "extract_date_time": time_extract_date_time,
+    "extract_timestamps": time_extract_timestamps,
+    "keyword_search": time_keyword_search,
+    "id_warning_patterns": time_id_warning_patterns,
+    "event_sequence": time_event_sequence,
+    "render_reports": time_render_reports,
+    "append": time_append,
+}
+
+# the cases that run against a storage backend (--storage)
+STORAGE_CASES = ("summary", "activity", "keyword_search", "append")
+
+
+def peak_rss_mb():
+    """Returns the peak resident set size of this process in MiB."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case, path, options):
+    """Runs one benchmark case in this process and returns its
+    measurements. The suite runs every case in a new process, so that the
+    peak RSS is the case's own.
+
+    Args:
+        case (str): a key of BENCHMARK_CASES.
+        path (str): the log file.
+        options (dict): keyword arguments for SystemEventsManager. With a
+            storage backend, the log is first imported into a database
+            "<path>.db" (untimed) and the case runs against it.
+
+    Returns:
+        dict: "seconds" (wall time of the analysis, without the import),
+            "lines" (lines processed) and "peak_rss_mb".
+    """
+    module = load_module()
+    manager = module.SystemEventsManager(**options)
+    with open(path, "rb") as file:
+        lines = sum(block.count(b"\n")
+                    for block in iter(lambda: file.read(1 << 20), b""))
+    if options.get("storage", "text") != "text":
+        database = path + ".db"
+        if not os.path.exists(database):
+            module.SystemEventsManager().import_log(path, database,
+                                                    storage=options["storage"])
+        path = database
+
+    with open(os.devnull, "w") as devnull:
+        # extract_date_time() prints every event
+        with contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            processed = BENCHMARK_CASES[case](module, manager, path)
+            seconds = time.perf_counter() - start
+    return {"seconds": seconds,
+            "lines": lines if processed is None else processed,
+            "peak_rss_mb": peak_rss_mb()}
+
+
+def remove_sidecars(path):
+    """Deletes the caches and indexes saved next to a log file."""
+    directory, name = os.path.split(path)
+    for entry in os.listdir(directory):
+        if entry.startswith(name + "."):
+            entry_path = os.path.join(directory, entry)
+            if os.path.isdir(entry_path):
+                shutil.rmtree(entry_path)
+            else:
+                os.remove(entry_path)
+
+
+def current_commit():
+    """Returns the git commit of the module, or None outside a checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(MODULE_PATH),
+            capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def run_suite(lines, seed, cases, options, warm=False, log=None):
+    """Times benchmark cases on a generated log.
+
+    Every case runs in a new process on a fresh copy of the log. By default
+    the copy has no caches or indexes, so the times include building them;
+    with warm=True the case is run once first and then timed with the
+    caches it saved.
+
+    Args:
+        lines (int): number of events in the generated log.
+        seed (int): seed of the generator.
+        cases (list of str): keys of BENCHMARK_CASES to run.
+        options (dict): keyword arguments for SystemEventsManager.
+        warm (bool, optional): time with caches. Default is False.
+        log (str, optional): an existing log to use instead of generating
+            one.
+
+    Raises:
+        RuntimeError: If a case fails.
+
+    Returns:
+        dict: the environment and the measurements of every case, ready to
+            be saved as JSON.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        source = log or os.path.join(scratch, "generated.txt")
+        if log is None:
+            generate_log(source, lines, seed)
+        path = os.path.join(scratch, "events.txt")
+
+        for case in cases:
+            if (options.get("storage", "text") != "text"
+                    and case not in STORAGE_CASES):
+                continue
+            shutil.copy(source, path)
+            remove_sidecars(path)
+            command = [sys.executable, BENCHMARK_PATH, "run-case", case,
+                       path, json.dumps(options)]
+            for _ in range(2 if warm else 1):
+                result = subprocess.run(command, capture_output=True,
+                                        text=True)
+                if result.returncode != 0:
+                    raise RuntimeError(f"{case} failed:\n{result.stderr}")
+            measurement = json.loads(result.stdout)
+            measurement["lines_per_second"] = (
+                measurement["lines"] / measurement["seconds"]
+                if measurement["seconds"] else None
+            )
+            results[case] = measurement
+            print(f"{case:20} {measurement['seconds']:10.3f} s "
+                  f"{measurement['peak_rss_mb']:9.1f} MiB "
+                  f"{measurement['lines_per_second'] or 0:14,.0f} lines/s",
+                  flush=True)
+
+    return {"commit": current_commit(), "python": platform.python_version(),
+            "platform": platform.platform(), "lines": lines, "seed": seed,
+            "options": options, "warm": warm, "results": results}
+
+
+def compare_results(baseline, current, tolerance):
+    """Prints the change of every case between two suite results.
+
+    Args:
+        baseline (dict): the earlier run_suite() result.
+        current (dict): the later run_suite() result.
+        tolerance (float): allowed slowdown, e.g. 0.1 for 10%.
+
+    Returns:
+        bool: True if no case got slower than the tolerance allows.
+    """
+    passed = True
+    for case, measurement in current["results"].items():
+        before = baseline["results"].get(case)
+        if before is None:
+            print(f"new  {case:20} {measurement['seconds']:10.3f} s")
+            continue
+        ratio = measurement["seconds"] / before["seconds"]
+        status = "ok" if ratio <= 1 + tolerance else "SLOW"
+        passed = passed and status == "ok"
+        print(f"{status:4} {case:20} {before['seconds']:10.3f} s -> "
+              f"{measurement['seconds']:10.3f} s ({ratio:6.2f}x), "
+              f"peak {before['peak_rss_mb']:.1f} -> "
+              f"{measurement['peak_rss_mb']:.1f} MiB")
+    return passed
+
+
+def line_count(text):
+    """Parses a number of lines such as "10k", "1m" or "250000"."""
+    if text.lower() in LINE_COUNTS:
+        return LINE_COUNTS[text.lower()]
+    return int(text)
+
+
+def parse_args(arglist):
+    """Processes command line arguments.
+
+    Args:
+        arglist (list of str): arguments from the command line.
+
+    Returns:
+        namespace: the parsed arguments as a namespace.
+    """
+    parser = ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    startup_parser = subparsers.add_parser(
+        "startup", help="check the startup time of the non-plotting commands"
+    )
+    startup_parser.add_argument("--budget-ms", type=float, default=150,
+                                help="maximum median startup time")
+    startup_parser.add_argument("--repeat", type=int, default=5,
+                                help="runs per command")
+
+    generate_parser = subparsers.add_parser(
+        "generate", help="write a synthetic log in the sample's format"
+    )
+    generate_parser.add_argument("path", help="file to write")
+    generate_parser.add_argument("--lines", type=line_count, default="10k",
+                                 help="10k, 1m, 100m or a number")
+    generate_parser.add_argument("--seed", type=int, default=0)
+
+    suite_parser = subparsers.add_parser(
+        "suite", help="time every analysis on a generated log"
+    )
+    suite_parser.add_argument("--lines", type=line_count, default="10k",
+                              help="10k, 1m, 100m or a number")
+    suite_parser.add_argument("--seed", type=int, default=0)
+    suite_parser.add_argument("--log", default=None,
+                              help="time on this log instead of a "
+                                   "generated one")
+    suite_parser.add_argument("--cases", nargs="+",
+                              choices=list(BENCHMARK_CASES),
+                              default=list(BENCHMARK_CASES))
+    suite_parser.add_argument("--warm", action="store_true",
+                              help="time with the caches of a first run")
+    suite_parser.add_argument("--streaming", action="store_true")
+    suite_parser.add_argument("--rollups", action="store_true")
+    suite_parser.add_argument("--storage", choices=["text", "sqlite"],
+                              default="text",
+                              help="run the cases that support it against "
+                                   "the log imported into a database")
+    suite_parser.add_argument("--engine",
+                              choices=["store", "c", "pyarrow", "mmap"],
+                              default="store")
+    suite_parser.add_argument("--workers", type=int, default=1)
+    suite_parser.add_argument("--output", default=None,
+                              help="JSON file for the results")
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="compare two suite results"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=0.1,
+                                help="allowed slowdown (0.1 = 10%%)")
+
+    # used by suite to run every case in a new process
+    run_case_parser = subparsers.add_parser("run-case")
+    run_case_parser.add_argument("case", choices=list(BENCHMARK_CASES))
+    run_case_parser.add_argument("path")
+    run_case_parser.add_argument("options", type=json.loads)
+    return parser.parse_args(arglist)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    if args.command == "startup":
+        sys.exit(0 if check_startup(args.budget_ms, args.repeat) else 1)
+    elif args.command == "generate":
+        generate_log(args.path, args.lines, args.seed)
+    elif args.command == "suite":
+        options = {"streaming": args.streaming, "csv_engine": args.engine,
+                   "workers": args.workers, "rollups": args.rollups,
+                   "storage": args.storage}
+        try:
+            report = run_suite(args.lines, args.seed, args.cases, options,
+                               args.warm, args.log)
+        except RuntimeError as error:
+            sys.exit(f"FAIL {error}")
+        output = args.output or f"benchmark-{args.lines}.json"
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved {output}")
+    elif args.command == "compare":
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        with open(args.current, "r", encoding="utf-8") as file:
+            current = json.load(file)
+        sys.exit(0 if compare_results(baseline, current, args.tolerance)
+                 else 1)
+    elif args.command == "run-case":
+        print(json.dumps(run_case(args.case, args.path, args.options)))
@@ -1,8 +1,3754 @@
 import re
-import pandas as pd
-from argparse import ArgumentParser
+from argparse import ArgumentError, ArgumentParser
 import sys
-import matplotlib.pyplot as plt
+import os
+import mmap
+import json
+import csv
+from collections import Counter, deque
+from array import array
+from datetime import date, datetime, timedelta
+from bisect import bisect_left, bisect_right
+from itertools import compress, repeat
+from operator import add, mul
+from functools import lru_cache, wraps
+from time import perf_counter
+
+FIELD_SEPARATOR = " | "
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+SECONDS_PER_DAY = 86400
+
+
+@lru_cache(maxsize=None)
+def _day_number(date_text):
+    """Converts a 'YYYY-MM-DD' string into days since 1970-01-01."""
+    if (len(date_text) != 10 or date_text[4] != "-"
+            or date_text[7] != "-"):
+        # fromisoformat() also takes other ISO forms, e.g. '2024-W01-1'
+        raise ValueError(f"Invalid date: {date_text!r}")
+    return date.fromisoformat(date_text).toordinal() - EPOCH_ORDINAL
+
+
+@lru_cache(maxsize=None)
+def _seconds_of_day(time_text):
+    """Converts a 'HH:MM:SS' string into seconds since midnight."""
+    hour, minute, second = time_text[:2], time_text[3:5], time_text[6:]
+    digits = hour + minute + second
+    if (len(time_text) != 8 or time_text[2] != ":" or time_text[5] != ":"
+            or not digits.isascii() or not digits.isdigit()
+            or hour > "23" or minute > "59" or second > "59"):
+        raise ValueError(f"Invalid time: {time_text!r}")
+    return int(hour) * 3600 + int(minute) * 60 + int(second)
+
+
+@lru_cache(maxsize=None)
+def day_to_date(day_number):
+    """Converts days since 1970-01-01 back into a date object."""
+    return date.fromordinal(day_number + EPOCH_ORDINAL)
+
+
+def parse_timestamp(text):
+    """Converts a 'YYYY-MM-DD HH:MM:SS' timestamp into seconds since
+    1970-01-01 00:00:00.
+
+    Args:
+        text (str): the timestamp field of an event.
+
+    Raises:
+        ValueError: If the timestamp is not in the expected format or not a
+            valid date and time.
+
+    Returns:
+        int: seconds since the epoch (timestamps are treated as naive).
+    """
+    if len(text) != 19 or text[10] != " ":
+        raise ValueError(f"Invalid timestamp: {text!r}")
+    return (_day_number(text[:10]) * SECONDS_PER_DAY
+            + _seconds_of_day(text[11:]))
+
+
+# a timestamp field with a valid time (its date is checked by _day_number())
+# and an event ID
+_TIMESTAMP_FIELD = re.compile(
+    r"(\d{4}-\d\d-\d\d) (?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d", re.ASCII
+)
+_EVENT_ID = re.compile(r"ID[0-9]+")
+
+
+def parse_event_id(event_id):
+    """Converts an event ID into its number (e.g. 'ID004' -> 4).
+
+    Raises:
+        ValueError: If the text is not 'ID' followed by digits.
+    """
+    if _EVENT_ID.fullmatch(event_id) is None:
+        raise ValueError(f"Invalid event ID: {event_id!r}")
+    return int(event_id[2:])
+
+
+def format_timestamp(seconds):
+    """Converts seconds since the epoch back into 'YYYY-MM-DD HH:MM:SS'."""
+    day_number, seconds = divmod(seconds, SECONDS_PER_DAY)
+    hour, seconds = divmod(seconds, 3600)
+    minute, second = divmod(seconds, 60)
+    return (f"{day_to_date(day_number).isoformat()} "
+            f"{hour:02d}:{minute:02d}:{second:02d}")
+
+
+def format_event_id(number):
+    """Formats an event number as an event ID (e.g. 7 -> 'ID007')."""
+    return f"ID{number:03d}"
+
+
+class EventStore:
+    """A parsed, columnar copy of a system events log. Every line in the
+    'timestamp | category | ID | description' format is parsed once and
+    stored column by column in compact arrays, so the analyses never have to
+    split the text again.
+
+    Attributes:
+        timestamps (array of int): seconds since the epoch for every event.
+        category_codes (array of int): index into categories for every event.
+        ids (array of int): the number part of every event ID.
+        description_codes (array of int): index into descriptions for every
+            event.
+        categories (list of str): every distinct category, by code.
+        descriptions (list of str): every distinct description, by code.
+        indexed_size (int): number of bytes of the file already parsed.
+    """
+
+    # the columns saved in a binary cache (see load_event_store())
+    columns = ("timestamps", "category_codes", "ids", "description_codes")
+
+    def __init__(self):
+        self.timestamps = array("q")
+        self.category_codes = array("H")
+        self.ids = array("q")
+        self.description_codes = array("I")
+        self.categories = []
+        self.descriptions = []
+        self._category_lookup = {}
+        self._description_lookup = {}
+        self.indexed_size = 0
+
+    @classmethod
+    def from_file(cls, path):
+        """Parses a system events log into a new EventStore.
+
+        Args:
+            path (str): path to the system events file.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Returns:
+            EventStore: the parsed events. Lines that are not events (see
+                _split_event_line()) are skipped.
+        """
+        store = cls()
+        store.read_from(path)
+        return store
+
+    def read_from(self, path, start=0):
+        """Parses the events of a log file from a byte offset to its end and
+        adds them to the store.
+
+        Args:
+            path (str): path to the system events file.
+            start (int, optional): byte offset to start at; should be the
+                start of a line. Default is 0.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+        """
+        events_before = len(self)
+        with open(path, "r", encoding="utf-8") as file:
+            file.seek(start)
+            for line in file:
+                parts = line.rstrip("\n").split(FIELD_SEPARATOR, 3)
+                if len(parts) < 4:
+                    continue
+                try:
+                    self.append(*parts)
+                except ValueError:
+                    # an invalid timestamp or ID, skipped like a short line
+                    continue
+            # everything read from the file has been parsed
+            self.indexed_size = file.buffer.tell()
+        _count("bytes_read", self.indexed_size - start)
+        _count("lines_parsed", len(self) - events_before)
+
+    def save_cache(self, cache_path, meta, start=0):
+        """Writes the columns to a cache directory, one raw binary file per
+        column, and then its meta.json. Only the events from start on are
+        written; the ones before are expected to be in the files already.
+
+        Args:
+            cache_path (str): the cache directory.
+            meta (dict): what the cache was made from (see
+                load_event_store()); saved together with the vocabularies.
+            start (int, optional): number of events already in the column
+                files. Default is 0.
+        """
+        os.makedirs(cache_path, exist_ok=True)
+        for name in self.columns:
+            column = getattr(self, name)
+            column_path = os.path.join(cache_path, name + ".bin")
+            mode = "r+b" if start and os.path.exists(column_path) else "wb"
+            with open(column_path, mode) as file:
+                # drop whatever a write that did not finish left behind
+                file.truncate(start * column.itemsize)
+                file.seek(start * column.itemsize)
+                file.write(memoryview(column)[start:])
+
+        meta = dict(meta, events=len(self),
+                    indexed_size=self.indexed_size,
+                    byteorder=sys.byteorder,
+                    typecodes=[getattr(self, name).typecode
+                               for name in self.columns],
+                    categories=self.categories,
+                    descriptions=self.descriptions)
+        temporary_path = os.path.join(cache_path, "meta.json.tmp")
+        with open(temporary_path, "w", encoding="utf-8") as saved:
+            json.dump(meta, saved)
+        os.replace(temporary_path, os.path.join(cache_path, "meta.json"))
+
+    @classmethod
+    def load_cache(cls, cache_path):
+        """Loads the columns saved by save_cache(). The column files are
+        memory-mapped and copied into the store's arrays in one step each,
+        without parsing anything.
+
+        Args:
+            cache_path (str): the cache directory.
+
+        Returns:
+            tuple: (EventStore, meta dict), or (None, None) if there is no
+                usable cache.
+        """
+        try:
+            with open(os.path.join(cache_path, "meta.json"), "r",
+                      encoding="utf-8") as saved:
+                meta = json.load(saved)
+        except (FileNotFoundError, ValueError):
+            return None, None
+
+        store = cls()
+        if (meta.get("byteorder") != sys.byteorder
+                or meta.get("typecodes") != [getattr(store, name).typecode
+                                             for name in cls.columns]):
+            return None, None
+
+        for name in cls.columns:
+            column = getattr(store, name)
+            size = meta["events"] * column.itemsize
+            if not size:
+                continue
+            try:
+                with open(os.path.join(cache_path, name + ".bin"),
+                          "rb") as file:
+                    with mmap.mmap(file.fileno(), 0,
+                                   access=mmap.ACCESS_READ) as mapped:
+                        if len(mapped) < size:
+                            return None, None
+                        with memoryview(mapped) as view:
+                            part = view[:size]
+                            column.frombytes(part)
+                            part.release()
+                _count("bytes_read", size)
+            except (FileNotFoundError, ValueError):
+                return None, None
+
+        store.categories = [sys.intern(category)
+                            for category in meta["categories"]]
+        store.descriptions = [sys.intern(description)
+                              for description in meta["descriptions"]]
+        store._category_lookup = {
+            category: code for code, category in enumerate(store.categories)
+        }
+        store._description_lookup = {
+            description: code
+            for code, description in enumerate(store.descriptions)
+        }
+        store.indexed_size = meta["indexed_size"]
+        return store, meta
+
+    def append(self, timestamp, category, event_id, description):
+        """Adds one event to the end of the store.
+
+        Args:
+            timestamp (str): 'YYYY-MM-DD HH:MM:SS' timestamp of the event.
+            category (str): category of the event (e.g. 'Warning').
+            event_id (str): ID of the event (e.g. 'ID004').
+            description (str): description of the event.
+
+        Raises:
+            ValueError: If the timestamp or the event ID is invalid; nothing
+                is added then.
+        """
+        # the fields that can be invalid are parsed before anything is added
+        seconds = parse_timestamp(timestamp.strip())
+        number = parse_event_id(event_id.strip())
+        category = category.strip()
+        description = description.strip()
+
+        category_code = self._category_lookup.get(category)
+        if category_code is None:
+            category_code = len(self.categories)
+            self._category_lookup[category] = category_code
+            self.categories.append(sys.intern(category))
+        description_code = self._description_lookup.get(description)
+        if description_code is None:
+            description_code = len(self.descriptions)
+            self._description_lookup[description] = description_code
+            self.descriptions.append(sys.intern(description))
+
+        self.timestamps.append(seconds)
+        self.category_codes.append(category_code)
+        self.ids.append(number)
+        self.description_codes.append(description_code)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def category_code(self, category):
+        """Returns the code of a category, or None if it never occurs."""
+        return self._category_lookup.get(category)
+
+    def row(self, index):
+        """Returns the fields of one event as
+        (timestamp, category, event ID, description) strings."""
+        return (
+            format_timestamp(self.timestamps[index]),
+            self.categories[self.category_codes[index]],
+            format_event_id(self.ids[index]),
+            self.descriptions[self.description_codes[index]],
+        )
+
+    def line(self, index):
+        """Returns one event formatted as a line of the log file."""
+        return FIELD_SEPARATOR.join(self.row(index))
+
+    def pair_counts(self):
+        """Returns how many events share each (category, description)
+        pair."""
+        counts = {}
+        for pair in zip(self.category_codes, self.description_codes):
+            counts[pair] = counts.get(pair, 0) + 1
+        return {
+            (self.categories[category_code],
+             self.descriptions[description_code]): num
+            for (category_code, description_code), num in counts.items()
+        }
+
+    def timestamps_datetime64(self):
+        """Returns the timestamps as a NumPy datetime64[s] array that shares
+        memory with the store."""
+        import numpy as np
+
+        return np.frombuffer(self.timestamps, dtype=np.int64).view(
+            "datetime64[s]"
+        )
+
+    def months(self):
+        """Returns the month (1-12) of every event as a NumPy array."""
+        months = self.timestamps_datetime64().astype("datetime64[M]")
+        return months.astype("int64") % 12 + 1
+
+    def category_counts(self):
+        """Returns category -> number of events, counted on the category
+        codes."""
+        import numpy as np
+
+        counts = np.bincount(
+            np.frombuffer(self.category_codes, dtype=np.uint16),
+            minlength=len(self.categories)
+        )
+        return dict(zip(self.categories, counts.tolist()))
+
+
+def event_cache_path(path):
+    """Returns the path of the binary cache directory of a log file."""
+    return path + ".cache"
+
+
+def _hash_file(path, start, end, hasher=None):
+    """Feeds the bytes of a file from start to end to a SHA-256 hasher (a
+    new one by default) and returns the hasher."""
+    import hashlib
+
+    hasher = hashlib.sha256() if hasher is None else hasher
+    with open(path, "rb") as file:
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = file.read(min(1 << 20, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+# bytes at each end of the already read part of a log that are hashed to
+# tell appended events from a rewritten file (see prefix_fingerprint())
+FINGERPRINT_SIZE = 4096
+
+
+def prefix_fingerprint(path, size):
+    """Returns a SHA-256 hash of the first and the last FINGERPRINT_SIZE
+    bytes of the first size bytes of a log file. A cache or index made from
+    those bytes saves the hash; if the file grew but the hash is the same,
+    events were appended, otherwise the file was rewritten and has to be
+    read again. Only two small blocks are read, however large the file.
+
+    Args:
+        path (str): path to the system events file.
+        size (int): number of bytes already read.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+
+    Returns:
+        str: the hexadecimal hash.
+    """
+    hasher = _hash_file(path, 0, min(size, FINGERPRINT_SIZE))
+    if size > FINGERPRINT_SIZE:
+        _hash_file(path, max(FINGERPRINT_SIZE, size - FINGERPRINT_SIZE),
+                   size, hasher)
+    return hasher.hexdigest()
+
+
+def load_event_store(path, verify="stat"):
+    """Returns the parsed events of a log file, using its binary cache
+    ("<path>.cache") so that only events appended since the cache was
+    written are parsed. The cache is created or brought up to date; if it
+    cannot be written (e.g. the log is in a read-only directory), the
+    parsed events are still returned.
+
+    Args:
+        path (str): path to the system events file.
+        verify (str, optional): how the cache is checked against the file:
+            "stat" trusts it if the file's size and modification time are
+            unchanged, or if the file only grew and the end of the cached
+            part is unchanged (see prefix_fingerprint()), which tells
+            appended events from a rewritten file; "hash" compares a
+            SHA-256 hash of the part of the file the cache was made from,
+            which also catches edits in the middle and survives copies and
+            touches. Default is "stat".
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+        ValueError: If verify is unknown or a line is invalid.
+
+    Returns:
+        EventStore: the parsed events.
+    """
+    if verify not in ("stat", "hash"):
+        raise ValueError(f"Unknown cache check \"{verify}\".")
+    stat = os.stat(path)
+    cache_path = event_cache_path(path)
+
+    store, meta = EventStore.load_cache(cache_path)
+    hasher = None
+    if store is not None:
+        if verify == "hash":
+            valid = stat.st_size >= store.indexed_size
+            if valid:
+                hasher = _hash_file(path, 0, store.indexed_size)
+                valid = hasher.hexdigest() == meta.get("sha256")
+            if valid and stat.st_size == store.indexed_size:
+                return store
+        else:
+            if (stat.st_size == meta["size"]
+                    and stat.st_mtime_ns == meta["mtime_ns"]):
+                return store
+            valid = (stat.st_size >= store.indexed_size
+                     and prefix_fingerprint(path, store.indexed_size)
+                     == meta.get("fingerprint"))
+        if not valid:
+            store = hasher = None
+
+    saved_events = 0
+    if store is None:
+        store = EventStore()
+    else:
+        saved_events = len(store)
+    start = store.indexed_size
+    store.read_from(path, start)
+
+    meta = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "fingerprint": prefix_fingerprint(path, store.indexed_size)}
+    if verify == "hash":
+        # the hasher already holds the part of the file that was cached
+        meta["sha256"] = _hash_file(
+            path, start, store.indexed_size, hasher
+        ).hexdigest()
+    try:
+        store.save_cache(cache_path, meta, saved_events)
+    except OSError:
+        # the events are only kept in memory
+        pass
+    return store
+
+
+def iter_line_chunks(path, chunk_size=1 << 20, start=0, end=None):
+    """Reads a log file in fixed-size binary chunks that are cut after the
+    last complete line, so memory use stays the same no matter how large
+    the file is.
+
+    Args:
+        path (str): path to the system events file.
+        chunk_size (int, optional): number of bytes read at a time. Default
+            is 1 MiB.
+        start (int, optional): byte offset to start reading at; should be
+            the start of a line. Default is 0.
+        end (int, optional): byte offset to stop reading at; should be the
+            start of a line. Default is the end of the file.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+
+    Yields:
+        bytes: whole lines of the file, the last one without a newline only
+            at the end of the range.
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        remaining = float("inf") if end is None else end - start
+        remainder = b""
+        while remaining > 0:
+            chunk = file.read(int(min(chunk_size, remaining)))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            _count("bytes_read", len(chunk))
+            cut = chunk.rfind(b"\n") + 1
+            if cut:
+                yield remainder + chunk[:cut]
+                remainder = chunk[cut:]
+            else:
+                remainder += chunk
+        if remainder:
+            yield remainder
+
+
+def iter_events(path, chunk_size=1 << 20, start=0, end=None):
+    """Streams the events of a log file without loading the whole file (see
+    iter_line_chunks()).
+
+    Args:
+        path (str): path to the system events file.
+        chunk_size (int, optional): number of bytes read at a time. Default
+            is 1 MiB.
+        start (int, optional): byte offset to start reading at; should be
+            the start of a line. Default is 0.
+        end (int, optional): byte offset to stop reading at; should be the
+            start of a line. Default is the end of the file.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+
+    Yields:
+        list of str: the stripped (timestamp, category, ID, description)
+            fields of every line. Lines that are not events (see
+            _split_event_line()) are skipped.
+    """
+    for chunk in iter_line_chunks(path, chunk_size, start, end):
+        lines = chunk.split(b"\n")
+        _count("lines_parsed", len(lines) - (not lines[-1]))
+        for line in lines:
+            fields = _split_event_line(line.decode("utf-8"))
+            if fields is not None:
+                yield fields
+
+
+# the start of an event line: its date and time, the category and a valid
+# ID up to the separator in front of the description (so the same lines
+# count as events as in _split_event_line()); one search of a whole chunk,
+# with a newline put in front, finds every event in it (a literal "\n" is
+# found much faster than a multiline "^")
+_EVENT_FIELDS = r" \| (?:(?! \| )[^\n])* \|[^\S\n]*ID[0-9]+[^\S\n]* \| "
+DATE_TIME_PATTERN = re.compile(
+    r"\n(\d{4}-\d\d-\d\d) (\d\d:\d\d:\d\d)" + _EVENT_FIELDS, re.ASCII
+)
+TIMESTAMP_PATTERN = re.compile(
+    rb"\n(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)" + _EVENT_FIELDS.encode()
+)
+
+
+def iter_date_times(path, chunk_size=1 << 20, start=0, end=None):
+    """Streams the (date, time) of every event, found by searching whole
+    chunks of the file (see iter_line_chunks()) with DATE_TIME_PATTERN
+    instead of splitting every line.
+
+    Args:
+        path (str): path to the system events file.
+        chunk_size (int, optional): number of bytes read at a time. Default
+            is 1 MiB.
+        start (int, optional): byte offset to start reading at; should be
+            the start of a line. Default is 0.
+        end (int, optional): byte offset to stop reading at; should be the
+            start of a line. Default is the end of the file.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+
+    Yields:
+        tuple: ('YYYY-MM-DD', 'HH:MM:SS') strings of every line that starts
+            with a valid timestamp and a separator, in file order.
+    """
+    for chunk in iter_line_chunks(path, chunk_size, start, end):
+        date_times = DATE_TIME_PATTERN.findall("\n" + chunk.decode("utf-8"))
+        _count("regex_matches", len(date_times))
+        for date_time in date_times:
+            try:
+                parse_timestamp(" ".join(date_time))
+            except ValueError:
+                # e.g. a month 13, skipped like in the parsed events
+                continue
+            yield date_time
+
+
+def datetime64_from_digits(digits):
+    """Converts timestamps into a NumPy datetime64 array with arithmetic on
+    their bytes, without creating a string per timestamp.
+
+    Args:
+        digits (ndarray): (events, 19) uint8 array of the ASCII bytes of
+            'YYYY-MM-DD HH:MM:SS' timestamps.
+
+    Raises:
+        ValueError: If a timestamp is not a valid date and time.
+
+    Returns:
+        ndarray: datetime64[s] array of the timestamps.
+    """
+    valid, timestamps = _timestamps_from_digits(digits)
+    if not valid.all():
+        raise ValueError("Invalid timestamp in the log.")
+    return timestamps
+
+
+def _timestamps_from_digits(digits):
+    """Returns which rows of a datetime64_from_digits() array are valid
+    timestamps (bool array), and the datetime64[s] array of the timestamps
+    (meaningless in the invalid rows)."""
+    import numpy as np
+
+    # uint8 arithmetic wraps around, so the bytes below '0' are above 9 too
+    # (the dates of the invalid rows stay far from overflowing below)
+    numbers = digits - np.uint8(ord("0"))
+    digit_columns = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+    valid = (numbers[:, digit_columns] <= 9).all(axis=1)
+    valid &= ((digits[:, 4] == ord("-")) & (digits[:, 7] == ord("-"))
+              & (digits[:, 10] == ord(" ")) & (digits[:, 13] == ord(":"))
+              & (digits[:, 16] == ord(":")))
+
+    def number(offset, width):
+        value = numbers[:, offset].astype(np.int64)
+        for position in range(offset + 1, offset + width):
+            value = value * 10 + numbers[:, position]
+        return value
+
+    year, month, day = number(0, 4), number(5, 2), number(8, 2)
+    hour, minute, second = number(11, 2), number(14, 2), number(17, 2)
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + (day - 1)
+    valid &= ~((month < 1) | (month > 12) | (day < 1)
+               | (days.astype("datetime64[M]") != months)
+               | (hour > 23) | (minute > 59) | (second > 59))
+    return valid, days.astype("datetime64[s]") + (hour * 3600 + minute * 60
+                                                  + second)
+
+
+def extract_timestamps(path, chunk_size=1 << 20, start=0, end=None):
+    """Extracts the timestamp of every event into a NumPy array by searching
+    whole chunks of the file with TIMESTAMP_PATTERN (see
+    iter_line_chunks() and datetime64_from_digits()).
+
+    Args:
+        path (str): path to the system events file.
+        chunk_size (int, optional): number of bytes read at a time. Default
+            is 1 MiB.
+        start (int, optional): byte offset to start reading at; should be
+            the start of a line. Default is 0.
+        end (int, optional): byte offset to stop reading at; should be the
+            start of a line. Default is the end of the file.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+
+    Returns:
+        ndarray: datetime64[s] array of the valid timestamps, in file
+            order.
+    """
+    import numpy as np
+
+    def convert(timestamps):
+        digits = np.frombuffer(b"".join(timestamps), dtype=np.uint8)
+        valid, converted = _timestamps_from_digits(digits.reshape(-1, 19))
+        return converted[valid]
+
+    parts = []
+    # the matches of small chunks are converted together
+    pending = []
+    for chunk in iter_line_chunks(path, chunk_size, start, end):
+        timestamps = TIMESTAMP_PATTERN.findall(b"\n" + chunk)
+        _count("regex_matches", len(timestamps))
+        pending += timestamps
+        if len(pending) >= 1 << 16:
+            parts.append(convert(pending))
+            pending = []
+    parts.append(convert(pending))
+    return np.concatenate(parts)
+
+
+class EventAggregator:
+    """Running totals over a stream of events. Every structure is bounded by
+    the number of distinct values (categories, descriptions, days), not by
+    the number of events, so a stream of any length can be summarized in
+    constant memory.
+
+    Attributes:
+        pattern_length (int): number of warning events that form a pattern.
+        events (int): number of events seen so far.
+        pair_counts (dict): (category, description) -> number of events.
+        month_counts (dict): month (1-12) -> number of events.
+        date_counts (dict): 'YYYY-MM-DD' -> number of events.
+        hour_counts (dict): hour (0-23) -> number of events.
+        warning_patterns (dict): tuple of pattern_length consecutive
+            ("Warning", description) events -> number of times it occurs,
+            counted once per warning that completes it, the same way as
+            id_warning_patterns().
+        warnings_seen (int): number of warning events seen so far.
+
+    Totals of consecutive parts of a file can be combined with merge(). For
+    that, an aggregator also remembers its first pattern_length - 1
+    warnings: they complete patterns that started in the part before.
+    """
+
+    def __init__(self, pattern_length=3):
+        self.pattern_length = pattern_length
+        self.events = 0
+        self.pair_counts = {}
+        self.month_counts = {}
+        self.date_counts = {}
+        self.hour_counts = {}
+        self.warning_patterns = {}
+        self.warnings_seen = 0
+        self._first_warnings = []
+        self._recent_warnings = deque(maxlen=pattern_length)
+
+    def update(self, timestamp, category, event_id, description):
+        """Adds one event to the running totals.
+
+        Args:
+            timestamp (str): 'YYYY-MM-DD HH:MM:SS' timestamp of the event.
+            category (str): category of the event.
+            event_id (str): ID of the event.
+            description (str): description of the event.
+        """
+        self.events += 1
+
+        pair = (category, description)
+        self.pair_counts[pair] = self.pair_counts.get(pair, 0) + 1
+
+        event_date = timestamp[:10]
+        month = int(timestamp[5:7])
+        hour = int(timestamp[11:13])
+        self.date_counts[event_date] = self.date_counts.get(event_date, 0) + 1
+        self.month_counts[month] = self.month_counts.get(month, 0) + 1
+        self.hour_counts[hour] = self.hour_counts.get(hour, 0) + 1
+
+        if category == "Warning":
+            self.warnings_seen += 1
+            if len(self._first_warnings) < self.pattern_length - 1:
+                self._first_warnings.append((category, description))
+            self._recent_warnings.append((category, description))
+            if len(self._recent_warnings) == self.pattern_length:
+                pattern = tuple(self._recent_warnings)
+                self.warning_patterns[pattern] = (
+                    self.warning_patterns.get(pattern, 0) + 1
+                )
+
+    def merge(self, later):
+        """Adds the totals of the part of the file that comes right after
+        this one, giving the same totals as if both parts had been read by
+        this aggregator.
+
+        Args:
+            later (EventAggregator): totals of the following part, with the
+                same pattern_length.
+        """
+        self.events += later.events
+        for mine, theirs in ((self.pair_counts, later.pair_counts),
+                             (self.month_counts, later.month_counts),
+                             (self.date_counts, later.date_counts),
+                             (self.hour_counts, later.hour_counts),
+                             (self.warning_patterns, later.warning_patterns)):
+            for key, num in theirs.items():
+                mine[key] = mine.get(key, 0) + num
+
+        # the later part's first warnings complete patterns that start
+        # with this part's last warnings
+        earlier_warnings = list(self._recent_warnings)
+        for warnings_before in range(len(later._first_warnings)):
+            window = (earlier_warnings
+                      + later._first_warnings[:warnings_before + 1])
+            if len(window) >= self.pattern_length:
+                pattern = tuple(window[-self.pattern_length:])
+                self.warning_patterns[pattern] = (
+                    self.warning_patterns.get(pattern, 0) + 1
+                )
+
+        self._first_warnings = (
+            self._first_warnings + later._first_warnings
+        )[:self.pattern_length - 1]
+        self._recent_warnings.extend(later._recent_warnings)
+        self.warnings_seen += later.warnings_seen
+
+
+async def follow_events(path, start=0, poll_interval=0.5,
+                        chunk_size=1 << 20):
+    """Follows a growing log file like "tail -F", yielding the events
+    appended to it. The file is polled every poll_interval seconds and a
+    line is only yielded once its newline has been written. If the file
+    gets smaller (it was truncated) it is read again from the start; if it
+    is replaced by a new file, the new file is followed once the old one
+    has been read to its end.
+
+    Args:
+        path (str): path to the system events file.
+        start (int, optional): byte offset to start reading at; should be
+            the start of a line. Default is 0, so the events already in the
+            file come first.
+        poll_interval (float, optional): seconds between two checks of the
+            file. Default is 0.5.
+        chunk_size (int, optional): maximum number of bytes read at a time.
+            Default is 1 MiB.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+
+    Yields:
+        list of lists: the stripped (timestamp, category, ID, description)
+            fields of the complete lines read in one step, in file order.
+            Lines without all four fields are skipped.
+    """
+    import asyncio
+
+    file = open(path, "rb")
+    offset = start
+    remainder = b""
+    try:
+        while True:
+            stat = os.fstat(file.fileno())
+            if stat.st_size < offset:
+                offset, remainder = 0, b""
+
+            if stat.st_size > offset:
+                file.seek(offset)
+                chunk = file.read(chunk_size)
+                offset += len(chunk)
+                lines = (remainder + chunk).split(b"\n")
+                remainder = lines.pop()
+                batch = []
+                for line in lines:
+                    parts = line.decode("utf-8").split(FIELD_SEPARATOR, 3)
+                    if len(parts) == 4:
+                        batch.append([part.strip() for part in parts])
+                if batch:
+                    yield batch
+                if len(chunk) == chunk_size:
+                    # more has been written already
+                    continue
+            else:
+                try:
+                    replaced = os.stat(path).st_ino != stat.st_ino
+                except FileNotFoundError:
+                    # being rotated; the new file is not there yet
+                    replaced = False
+                if replaced:
+                    file.close()
+                    file = open(path, "rb")
+                    offset, remainder = 0, b""
+                    continue
+            await asyncio.sleep(poll_interval)
+    finally:
+        file.close()
+
+
+class WarningAlertMonitor:
+    """Live totals of a followed log file (see follow_events()) that raise
+    an alert when a warning pattern becomes frequent.
+
+    Attributes:
+        totals (EventAggregator): running event type, month and warning
+            pattern counts of every event seen.
+        threshold (int): number of occurrences at which a warning pattern
+            raises an alert.
+    """
+
+    def __init__(self, pattern_length=3, threshold=5):
+        self.totals = EventAggregator(pattern_length)
+        self.threshold = threshold
+
+    def update(self, fields):
+        """Adds one event to the totals.
+
+        Args:
+            fields (list of str): the event's (timestamp, category, ID,
+                description) fields.
+
+        Returns:
+            dict or None: an alert if the event completed a warning pattern
+                that has now occurred exactly threshold times, with the
+                "pattern" (list of descriptions), its "count" and the
+                "timestamp" and "event_id" of the event; otherwise None.
+        """
+        totals = self.totals
+        totals.update(*fields)
+        if (fields[1] != "Warning"
+                or len(totals._recent_warnings) < totals.pattern_length):
+            return None
+        pattern = tuple(totals._recent_warnings)
+        count = totals.warning_patterns[pattern]
+        if count != self.threshold:
+            return None
+        return {"pattern": [description for _, description in pattern],
+                "count": count, "timestamp": fields[0],
+                "event_id": fields[2]}
+
+
+def split_byte_ranges(path, parts):
+    """Splits a file into about equal byte ranges that start and end at line
+    boundaries, so that each range can be read on its own.
+
+    Args:
+        path (str): path to the file.
+        parts (int): number of ranges wanted.
+
+    Returns:
+        list of tuples: (start, end) byte offsets, in file order.
+    """
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, "rb") as file:
+        for part in range(1, parts):
+            file.seek(max(size * part // parts, boundaries[-1]))
+            # move to the start of the next line
+            if file.tell() > 0:
+                file.seek(file.tell() - 1)
+                file.readline()
+            if boundaries[-1] < file.tell() < size:
+                boundaries.append(file.tell())
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _aggregate_range(path, start, end, pattern_length, chunk_size):
+    """Worker of parallel_aggregate(): totals of one byte range."""
+    aggregator = EventAggregator(pattern_length)
+    for fields in iter_events(path, chunk_size, start, end):
+        aggregator.update(*fields)
+    return aggregator
+
+
+def _date_times_range(path, start, end, chunk_size):
+    """Worker of parallel_date_times(): (date, time) pairs of one range."""
+    return list(iter_date_times(path, chunk_size, start, end))
+
+
+def _timestamps_range(path, start, end, chunk_size):
+    """Worker of parallel_timestamps(): timestamps of one range."""
+    return extract_timestamps(path, chunk_size, start, end)
+
+
+def _run_on_ranges(worker, path, workers, *args):
+    """Runs worker(path, start, end, *args) for every byte range of the
+    file on a process pool and returns the results in file order."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = split_byte_ranges(path, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(worker, path, start, end, *args)
+                   for start, end in ranges]
+        return [future.result() for future in futures]
+
+
+def parallel_aggregate(path, workers, pattern_length=3, chunk_size=1 << 20):
+    """Computes the same totals as streaming the whole file through one
+    EventAggregator, but splits the file into line-aligned byte ranges that
+    are read by separate processes and merges their partial totals in file
+    order (see EventAggregator.merge()).
+
+    Args:
+        path (str): path to the system events file.
+        workers (int): number of processes.
+        pattern_length (int, optional): number of warning events that form
+            a pattern. Default is 3.
+        chunk_size (int, optional): number of bytes each process reads at a
+            time. Default is 1 MiB.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+
+    Returns:
+        EventAggregator: the totals for the whole file.
+    """
+    total = EventAggregator(pattern_length)
+    for partial in _run_on_ranges(_aggregate_range, path, workers,
+                                  pattern_length, chunk_size):
+        total.merge(partial)
+    return total
+
+
+def parallel_date_times(path, workers, chunk_size=1 << 20):
+    """Extracts the (date, time) of every event like extract_date_time(),
+    with line-aligned byte ranges of the file read by separate processes.
+
+    Args:
+        path (str): path to the system events file.
+        workers (int): number of processes.
+        chunk_size (int, optional): number of bytes each process reads at a
+            time. Default is 1 MiB.
+
+    Returns:
+        list of tuples: (date, time) strings of every event, in file order.
+    """
+    date_times = []
+    for partial in _run_on_ranges(_date_times_range, path, workers,
+                                  chunk_size):
+        date_times.extend(partial)
+    return date_times
+
+
+def parallel_timestamps(path, workers, chunk_size=1 << 20):
+    """Extracts the timestamp of every event like extract_timestamps(), with
+    line-aligned byte ranges of the file read by separate processes.
+
+    Args:
+        path (str): path to the system events file.
+        workers (int): number of processes.
+        chunk_size (int, optional): number of bytes each process reads at a
+            time. Default is 1 MiB.
+
+    Returns:
+        ndarray: datetime64[s] array of the timestamps, in file order.
+    """
+    import numpy as np
+
+    return np.concatenate(_run_on_ranges(_timestamps_range, path, workers,
+                                         chunk_size))
+
+
+def count_event_types(pair_counts, events):
+    """Counts the events of each event type (category), the way summary()
+    reports them.
+
+    Args:
+        pair_counts (dict): (category, description) -> number of events.
+        events (list of str): the event types to count.
+
+    Returns:
+        dict: event type -> number of events in that category.
+    """
+    counts = {event: 0 for event in events}
+    for (category, _), num in pair_counts.items():
+        if category in counts:
+            counts[category] += num
+    return counts
+
+
+def _event_fields_from_lines(path, names):
+    """Reads the fields of the events of a log as read_csv(sep="|") does,
+    with the spaces of the separators around them, but by splitting every
+    line on ' | ' in Python (like EventStore.read_from()), for the logs
+    that have more than three '|' in a line."""
+    import pandas as pd
+
+    rows = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            parts = line.rstrip("\n").split(FIELD_SEPARATOR, 3)
+            if len(parts) == 4:
+                rows.append((parts[0] + " ", f" {parts[1]} ", f" {parts[2]} ",
+                             " " + parts[3]))
+    frame = pd.DataFrame(rows, columns=names, dtype=str)
+    return frame.astype({"category": "category", "description": "category"})
+
+
+def _frame_timestamps(fields):
+    """Converts the timestamp fields read by read_event_frame(), each with
+    the space in front of its separator, into a datetime64[s] array, NaT
+    where the field is not a valid timestamp followed by a space (see
+    parse_timestamp())."""
+    import numpy as np
+
+    # the code points of the usual 'YYYY-MM-DD HH:MM:SS ' fields; a longer
+    # field is cut after 21 characters
+    codes = fields.to_numpy(dtype="U21").view(np.uint32).reshape(-1, 21)
+    valid = ((codes[:, 19] == ord(" ")) & (codes[:, 20] == 0)
+             & (codes[:, :19] < 128).all(axis=1))
+    digits_valid, timestamps = _timestamps_from_digits(
+        codes[:, :19].astype(np.uint8)
+    )
+    valid &= digits_valid
+    timestamps[~valid] = np.datetime64("NaT")
+    # e.g. a field with more spaces around the timestamp
+    for row in np.flatnonzero(~valid).tolist():
+        field = fields.iat[row]
+        if isinstance(field, str) and field.endswith(" "):
+            try:
+                timestamps[row] = np.datetime64(
+                    parse_timestamp(field.strip()), "s"
+                )
+            except ValueError:
+                pass
+    return timestamps
+
+
+def _frame_event_ids(fields):
+    """Returns which event ID fields read by read_event_frame(), each with
+    the spaces of its separators, are 'ID' followed by digits (see
+    parse_event_id())."""
+    import numpy as np
+
+    # the code points of the usual ' ID<digits> ' fields; a longer field is
+    # cut after 24 characters
+    codes = fields.to_numpy(dtype="U24").view(np.uint32).reshape(-1, 24)
+    lengths = (codes != 0).sum(axis=1)
+    positions = np.arange(24)
+    digits = (positions >= 3) & (positions < lengths[:, None] - 1)
+    rows = np.arange(len(codes))
+    valid = ((lengths >= 5) & (lengths < 24) & (codes[:, 0] == ord(" "))
+             & (codes[:, 1] == ord("I")) & (codes[:, 2] == ord("D"))
+             & (codes[rows, np.maximum(lengths - 1, 0)] == ord(" "))
+             & (~digits | (codes - ord("0") <= 9)).all(axis=1))
+    # e.g. a field with more spaces around the ID
+    pattern = re.compile(rf" \s*{_EVENT_ID.pattern}\s* ")
+    for row in np.flatnonzero(~valid).tolist():
+        field = fields.iat[row]
+        valid[row] = (isinstance(field, str)
+                      and pattern.fullmatch(field) is not None)
+    return valid
+
+
+def read_event_frame(path, engine="c",
+                     columns=("timestamp", "category")):
+    """Reads a system events log into a typed pandas DataFrame with pandas'
+    vectorized CSV parser instead of splitting every line in Python.
+
+    The parser splits the lines on '|', so its fields are only the ones of
+    the other readers (see _split_event_line()) when every separator has a
+    space on each side; the other lines are skipped like the other readers
+    skip them. A log with more than three '|' in a line cannot be parsed
+    that way and is split on ' | ' in Python instead.
+
+    Args:
+        path (str): path to the system events file.
+        engine (str, optional): pandas parser engine, "c" or "pyarrow" (if
+            pyarrow is installed). Default is "c".
+        columns (tuple of str, optional): the fields to return, out of
+            "timestamp", "category", "event_id" and "description". Default
+            is ("timestamp", "category").
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+
+    Returns:
+        DataFrame: timestamp as datetime64, category and description as
+            categoricals, event_id as the integer part of the ID, for the
+            lines that are events.
+    """
+    import numpy as np
+    import pandas as pd
+
+    names = ["timestamp", "category", "event_id", "description"]
+    try:
+        frame = pd.read_csv(
+            path, sep="|", header=None, names=names,
+            dtype={"timestamp": str, "category": "category",
+                   "event_id": str, "description": "category"},
+            engine=engine,
+            # a quote is part of the text (the pyarrow engine has no such
+            # option, but a field of an event never starts with a quote)
+            **({"quoting": csv.QUOTE_NONE} if engine == "c" else {}),
+        )
+    except ValueError:
+        # a line with more than three '|', e.g. in its description
+        frame = _event_fields_from_lines(path, names)
+
+    category = frame["category"]
+    timestamps = _frame_timestamps(frame["timestamp"])
+    # the spaces of the separators (a single space between two separators
+    # belongs to the first one), a valid timestamp and a valid ID; the
+    # checks of the categoricals only look at their distinct values
+    valid = (~np.isnat(timestamps)
+             & category.str.startswith(" ", na=False).to_numpy()
+             & category.str.endswith(" ", na=False).to_numpy()
+             & (category.str.len() >= 2).to_numpy()
+             & frame["description"].str.startswith(" ", na=False).to_numpy()
+             & _frame_event_ids(frame["event_id"]))
+    frame = frame.loc[valid, list(columns)].reset_index(drop=True)
+
+    if "timestamp" in frame:
+        frame["timestamp"] = timestamps[valid]
+    for column in ("category", "description"):
+        if column in frame:
+            # only the distinct values have to be stripped
+            frame[column] = frame[column].cat.remove_unused_categories()
+            stripped = frame[column].cat.categories.str.strip()
+            if stripped.is_unique:
+                frame[column] = frame[column].cat.rename_categories(stripped)
+            else:
+                frame[column] = frame[column].str.strip().astype("category")
+    if "event_id" in frame:
+        frame["event_id"] = frame["event_id"].str.strip().str[2:].astype(
+            "int64"
+        )
+    _count("bytes_read", os.path.getsize(path))
+    _count("lines_parsed", len(frame))
+    return frame
+
+
+def event_histograms(frame):
+    """Counts the events of a read_event_frame() DataFrame per category,
+    month, day and hour.
+
+    Args:
+        frame (DataFrame): events with timestamp and category columns.
+
+    Returns:
+        dict: "category", "month", "date" and "hour" -> Series of event
+            counts indexed by that value, sorted by the index.
+    """
+    timestamps = frame["timestamp"].dt
+    return {
+        "category": frame["category"].value_counts(sort=False).sort_index(),
+        "month": timestamps.month.value_counts().sort_index(),
+        "date": timestamps.normalize().value_counts().sort_index(),
+        "hour": timestamps.hour.value_counts().sort_index(),
+    }
+
+
+def read_last_line(path, parse, block_size=4096):
+    """Finds the last line of a file that parse() accepts by reading backward
+    from the end of the file in blocks, so the cost does not depend on the
+    size of the file.
+
+    Args:
+        path (str): path to the file.
+        parse (function): takes the text of a line and returns its parsed
+            value, or None if the line should be skipped.
+        block_size (int, optional): number of bytes read per step. Default
+            is 4096.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+
+    Returns:
+        tuple: (value, offset) where value is what parse() returned for the
+            last accepted line and offset is the byte position where that
+            line starts, or (None, None) if no line was accepted.
+    """
+    with open(path, "rb") as file:
+        position = file.seek(0, os.SEEK_END)
+        buffer = b""
+        while True:
+            read_size = min(block_size, position)
+            position -= read_size
+            file.seek(position)
+            buffer = file.read(read_size) + buffer
+
+            # every line after the first newline in the buffer is whole; the
+            # first one is only whole once the start of the file is reached
+            lines = buffer.split(b"\n")
+            line_end = position + len(buffer)
+            for line in reversed(lines[1:] if position else lines):
+                line_end -= len(line)
+                value = parse(line.decode("utf-8"))
+                if value is not None:
+                    return value, line_end
+                line_end -= 1
+
+            if position == 0:
+                return None, None
+            buffer = lines[0]
+
+
+def _split_event_line(line):
+    """Returns the stripped fields of an event line, or None if the line is
+    not an event: it does not have all four fields, or its timestamp or ID
+    is invalid. Every way of reading the log (the parsed events, streaming
+    and the indexes) skips the same lines."""
+    parts = line.split(FIELD_SEPARATOR, 3)
+    if len(parts) != 4:
+        return None
+    fields = [part.strip() for part in parts]
+    # the same checks as parse_timestamp() and parse_event_id(), without
+    # converting anything
+    timestamp = _TIMESTAMP_FIELD.fullmatch(fields[0])
+    if timestamp is None or _EVENT_ID.fullmatch(fields[2]) is None:
+        return None
+    try:
+        _day_number(timestamp[1])
+    except ValueError:
+        return None
+    return fields
+
+
+def read_last_event(path, block_size=4096):
+    """Finds the last complete event in a log file without reading the whole
+    file (see read_last_line()).
+
+    Args:
+        path (str): path to the system events file.
+        block_size (int, optional): number of bytes read per step. Default
+            is 4096.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+        ValueError: If the file does not contain any complete event.
+
+    Returns:
+        tuple: (fields, offset) where fields is the list of stripped
+            (timestamp, category, ID, description) strings of the last event
+            and offset is the byte position where its line starts.
+    """
+    fields, offset = read_last_line(path, _split_event_line, block_size)
+    if fields is None:
+        raise ValueError(f"No events found in \"{path}\".")
+    return fields, offset
+
+
+def last_event_sidecar_path(path):
+    """Returns the path of the sidecar file that remembers the last event ID
+    of a log file."""
+    return path + ".last.json"
+
+
+def load_last_event_sidecar(path):
+    """Reads the last event ID remembered for a log file.
+
+    Args:
+        path (str): path to the system events file.
+
+    Returns:
+        dict or None: the sidecar contents (last_id, offset, size and
+            mtime_ns), or None if there is no sidecar or the log file changed
+            since it was written.
+    """
+    try:
+        with open(last_event_sidecar_path(path), "r") as sidecar:
+            saved = json.load(sidecar)
+        stat = os.stat(path)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if (saved.get("size"), saved.get("mtime_ns")) != (stat.st_size,
+                                                      stat.st_mtime_ns):
+        return None
+    return saved
+
+
+def save_last_event_sidecar(path, last_id, offset):
+    """Remembers the last event ID of a log file and where its line starts,
+    together with the file's current size and modification time.
+
+    Args:
+        path (str): path to the system events file.
+        last_id (str): ID of the last event (e.g. 'ID501').
+        offset (int): byte position where the last event's line starts.
+    """
+    stat = os.stat(path)
+    saved = {"last_id": last_id, "offset": offset, "size": stat.st_size,
+             "mtime_ns": stat.st_mtime_ns}
+    temporary_path = last_event_sidecar_path(path) + ".tmp"
+    with open(temporary_path, "w") as sidecar:
+        json.dump(saved, sidecar)
+    os.replace(temporary_path, last_event_sidecar_path(path))
+
+
+def _change_log_number(line):
+    """Returns the entry number of a change log line ('12. | ...'), or None
+    if the line is not an entry."""
+    number, _, rest = line.partition(". | ")
+    return int(number) if rest and number.isdigit() else None
+
+
+class FileLock:
+    """An exclusive lock (fcntl.flock) on an open file, held inside a with
+    statement. Every writer of the same file, in this process or another
+    one, waits for the lock, so read-then-append sequences do not
+    interleave. Where fcntl is not available (e.g. on Windows) nothing is
+    locked.
+
+    Attributes:
+        file (file object): the locked file.
+    """
+
+    def __init__(self, file):
+        self.file = file
+
+    def __enter__(self):
+        try:
+            import fcntl
+        except ImportError:
+            return self
+        fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            import fcntl
+        except ImportError:
+            return
+        fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+
+
+class ChangeLogWriter:
+    """Appends numbered entries to a change log. The number of the last entry
+    is read once from the end of the file and then counted in memory, and the
+    file stays open until close() is called, so each entry costs one write
+    no matter how long the change log is. Entries are written under a
+    FileLock, and if another writer added entries since the last write, the
+    numbering continues after theirs.
+
+    Attributes:
+        path (str): path to the change log file.
+        next_number (int): number that the next entry will get.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        with FileLock(self._file):
+            self._read_next_number()
+
+    def _read_next_number(self):
+        """Numbers the next entry after the last one in the file."""
+        last_number, _ = read_last_line(self.path, _change_log_number)
+        self.next_number = (last_number or 0) + 1
+        self._size = os.fstat(self._file.fileno()).st_size
+
+    def record(self, user_name, change_type, priority_level, description):
+        """Appends one entry to the change log.
+
+        Args:
+            user_name (str): The name of the user that is making the change.
+            change_type (str): Type of change being made.
+            priority_level (str): The priority level of the event.
+            description (str): Short description of the change being made.
+        """
+        self.record_many(
+            [(user_name, change_type, priority_level, description)]
+        )
+
+    def record_many(self, entries):
+        """Appends several entries to the change log with a single write.
+
+        Args:
+            entries (iterable of tuples): (user_name, change_type,
+                priority_level, description) for every entry.
+        """
+        entries = list(entries)
+        with FileLock(self._file):
+            if os.fstat(self._file.fileno()).st_size != self._size:
+                # another writer added entries
+                self._read_next_number()
+            lines = []
+            for number, (user_name, change_type, priority_level,
+                         description) in enumerate(entries,
+                                                   start=self.next_number):
+                lines.append(
+                    f"{number}. | {user_name} | {change_type} | "
+                    f"{priority_level} | {description}\n"
+                )
+            self._file.write("".join(lines))
+            self._file.flush()
+            # the numbers are only used up once the entries are written
+            self.next_number += len(lines)
+            self._size = os.fstat(self._file.fileno()).st_size
+
+    def close(self):
+        """Closes the change log file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def ends_with_newline(path):
+    """Returns True if a file is empty or its last byte is a newline."""
+    with open(path, "rb") as file:
+        if file.seek(0, os.SEEK_END) == 0:
+            return True
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class LogIndex:
+    """Base class for the indexes kept next to a system events log. An index
+    remembers how many bytes of the log it has already seen, so when the
+    log grows only the appended lines are read, and it is saved to a
+    "<path><suffix>" file between runs. The index also keeps a fingerprint
+    of the indexed bytes (see prefix_fingerprint()), so a file that was
+    rewritten rather than appended to is indexed again from the start.
+    Subclasses define what is stored for every event in add() and how it
+    is saved in to_dict()/from_dict().
+
+    Attributes:
+        path (str): path to the system events file.
+        indexed_size (int): number of bytes of the file already indexed.
+        fingerprint (str or None): prefix_fingerprint() of the indexed
+            bytes.
+        mtime_ns (int or None): modification time of the file when it was
+            last indexed.
+    """
+
+    suffix = ".index.json"
+    # number of regular expression matches made while indexing, for
+    # Instrumentation
+    regex_matches = 0
+
+    def __init__(self, path):
+        self.path = path
+        self.indexed_size = 0
+        self.fingerprint = None
+        self.mtime_ns = None
+
+    @classmethod
+    def index_path(cls, path):
+        """Returns the path of the saved index of a log file."""
+        return path + cls.suffix
+
+    @classmethod
+    def load(cls, path):
+        """Loads the saved index of a log file (or starts a new one) and
+        brings it up to date with the file.
+
+        Args:
+            path (str): path to the system events file.
+
+        Raises:
+            FileNotFoundError: If the log file is not found.
+
+        Returns:
+            tuple: the up to date index (LogIndex), and True if it differs
+                from the saved one (it was built, rebuilt or extended) and
+                should be saved again.
+        """
+        index = cls(path)
+        try:
+            data = index.read_saved()
+            index.from_dict(data)
+            index.indexed_size = data["size"]
+            index.fingerprint = data.get("fingerprint")
+            index.mtime_ns = data.get("mtime_ns")
+        except (FileNotFoundError, ValueError, KeyError):
+            index = cls(path)
+        return index, index.refresh()
+
+    def reset(self):
+        """Empties the index, keeping its settings (subclasses with
+        settings override this)."""
+        self.__init__(self.path)
+
+    def read_saved(self):
+        """Returns the data written by save().
+
+        Raises:
+            FileNotFoundError: If the index was never saved.
+            ValueError: If the saved index is not valid JSON.
+        """
+        with open(self.index_path(self.path), "r", encoding="utf-8") as saved:
+            return json.load(saved)
+
+    def save(self):
+        """Writes the index to "<path><suffix>"."""
+        data = self.to_dict()
+        data["size"] = self.indexed_size
+        data["fingerprint"] = self.fingerprint
+        data["mtime_ns"] = self.mtime_ns
+        temporary_path = self.index_path(self.path) + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as saved:
+            json.dump(data, saved)
+        os.replace(temporary_path, self.index_path(self.path))
+
+    def refresh(self):
+        """Indexes the events appended to the file since the last update, or
+        rebuilds the index if the file got smaller or its indexed bytes
+        changed.
+
+        Returns:
+            bool: True if the index changed.
+        """
+        stat = os.stat(self.path)
+        if (stat.st_size == self.indexed_size
+                and stat.st_mtime_ns == self.mtime_ns):
+            return False
+        if self.indexed_size and (
+            stat.st_size < self.indexed_size
+            or prefix_fingerprint(self.path, self.indexed_size)
+            != self.fingerprint
+        ):
+            # the file was rewritten, not appended to
+            self.reset()
+        elif stat.st_size == self.indexed_size:
+            # only touched; nothing to index
+            self.mtime_ns = stat.st_mtime_ns
+            return True
+
+        start = self.indexed_size
+        lines = 0
+        matches = self.regex_matches
+        with open(self.path, "rb") as file:
+            file.seek(start)
+            offset = start
+            for line in file:
+                fields = _split_event_line(line.decode("utf-8"))
+                if fields is not None:
+                    self.add(offset, fields)
+                offset += len(line)
+                lines += 1
+        self.indexed_size = offset
+        self.fingerprint = prefix_fingerprint(self.path, offset)
+        self.mtime_ns = stat.st_mtime_ns
+        _count("bytes_read", offset - start)
+        _count("lines_parsed", lines)
+        _count("regex_matches", self.regex_matches - matches)
+        return True
+
+    def add(self, offset, fields):
+        """Adds one event to the index.
+
+        Args:
+            offset (int): byte offset of the event's line in the file.
+            fields (list of str): the event's (timestamp, category, ID,
+                description) fields.
+        """
+        raise NotImplementedError
+
+    def to_dict(self):
+        """Returns the contents of the index as JSON-compatible data."""
+        raise NotImplementedError
+
+    def from_dict(self, data):
+        """Restores the contents of the index from to_dict() data."""
+        raise NotImplementedError
+
+
+class JournaledIndex(LogIndex):
+    """Base class for the indexes that are not rewritten in full every time
+    they are saved after an append: only what was added since the last save
+    is appended to a journal, "<path><journal_suffix>", as one JSON line.
+    Loading replays the journal on top of the saved index, and once the
+    journal has journal_limit entries the index is saved in full and the
+    journal starts over. Subclasses define what an entry holds in
+    journal_entry() and how it is added back in replay_entry(), and call
+    replay() at the end of from_dict().
+
+    Attributes:
+        journal_entries (int): number of entries in the journal; None if
+            the index was never saved in full.
+    """
+
+    journal_suffix = ".journal"
+    journal_limit = 100
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.journal_entries = None
+        # (indexed size, fingerprint) when the index was last saved
+        self._saved = None
+
+    @classmethod
+    def journal_path(cls, path):
+        """Returns the path of the journal of the index of a log file."""
+        return path + cls.journal_suffix
+
+    def read_saved(self):
+        """Returns the saved index with the entries of the journal to replay
+        in "journal". Every entry records the indexed size (and fingerprint)
+        it starts from, and only the entries that continue from the state
+        reached so far are replayed, so entries left behind by an
+        interrupted save or written by another process from an older state
+        are skipped, as is a last line that was cut short."""
+        data = super().read_saved()
+        data["journal"] = []
+        entries = 0
+        try:
+            with open(self.journal_path(self.path), "r",
+                      encoding="utf-8") as journal:
+                for line in journal:
+                    entries += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry["start"] != [data["size"],
+                                          data.get("fingerprint")]:
+                        continue
+                    data["journal"].append(entry)
+                    data.update(size=entry["size"],
+                                fingerprint=entry["fingerprint"],
+                                mtime_ns=entry["mtime_ns"])
+        except FileNotFoundError:
+            pass
+        data["journal_entries"] = entries
+        return data
+
+    def save(self):
+        """Appends what was added since the last save to the journal, or
+        writes the whole index to "<path><suffix>" if it was never saved in
+        full, was rebuilt or the journal is full."""
+        if (self.journal_entries is None
+                or self.journal_entries >= self.journal_limit):
+            super().save()
+            try:
+                os.remove(self.journal_path(self.path))
+            except FileNotFoundError:
+                pass
+            self.journal_entries = 0
+        else:
+            entry = self.journal_entry()
+            entry.update(start=list(self._saved), size=self.indexed_size,
+                         fingerprint=self.fingerprint, mtime_ns=self.mtime_ns)
+            with open(self.journal_path(self.path), "a",
+                      encoding="utf-8") as journal:
+                journal.write(json.dumps(entry) + "\n")
+            self.journal_entries += 1
+        self._saved = (self.indexed_size, self.fingerprint)
+        self.clear_journal_entry()
+
+    def replay(self, data):
+        """Adds the journal entries of read_saved() data to the index
+        restored from it."""
+        for entry in data.get("journal", ()):
+            self.replay_entry(entry)
+        self.journal_entries = data.get("journal_entries", 0)
+        self._saved = (data["size"], data.get("fingerprint"))
+
+    def journal_entry(self):
+        """Returns what was added since the last save as JSON-compatible
+        data."""
+        raise NotImplementedError
+
+    def clear_journal_entry(self):
+        """Starts a new journal_entry() after a save."""
+        raise NotImplementedError
+
+    def replay_entry(self, entry):
+        """Adds the contents of a journal_entry() to the index."""
+        raise NotImplementedError
+
+
+class InvertedIndex(JournaledIndex):
+    """An inverted index of a system events log: for every lowercase word of
+    the descriptions and for every category, the list (posting list) of the
+    events that contain it. The index is saved next to the log as
+    "<path>.index.json" and only the bytes appended since the last update
+    are indexed when the log grows. Saving after an append only adds the
+    offsets and postings of the new events to the journal,
+    "<path>.index.journal" (see JournaledIndex).
+
+    Attributes:
+        offsets (array of int): byte offset of every indexed event's line.
+        postings (dict): word -> array of event numbers containing it.
+        category_postings (dict): category -> array of event numbers.
+    """
+
+    suffix = ".index.json"
+    journal_suffix = ".index.journal"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.offsets = array("q")
+        self.postings = {}
+        self.category_postings = {}
+        # number of events when the index was last saved
+        self._saved_rows = 0
+
+    def journal_entry(self):
+        start = self._saved_rows
+
+        def new_rows(postings):
+            # the event numbers of a posting list are in increasing order
+            return {key: rows[bisect_left(rows, start):].tolist()
+                    for key, rows in postings.items() if rows[-1] >= start}
+
+        return {
+            "offsets": self.offsets[start:].tolist(),
+            "postings": new_rows(self.postings),
+            "categories": new_rows(self.category_postings),
+        }
+
+    def clear_journal_entry(self):
+        self._saved_rows = len(self.offsets)
+
+    def replay_entry(self, entry):
+        self.offsets.extend(entry["offsets"])
+        for word, rows in entry["postings"].items():
+            self.postings.setdefault(word, array("I")).extend(rows)
+        for category, rows in entry["categories"].items():
+            self.category_postings.setdefault(category,
+                                              array("I")).extend(rows)
+
+    def to_dict(self):
+        return {
+            "offsets": self.offsets.tolist(),
+            "postings": {word: rows.tolist()
+                         for word, rows in self.postings.items()},
+            "categories": {
+                category: rows.tolist()
+                for category, rows in self.category_postings.items()
+            },
+        }
+
+    def from_dict(self, data):
+        self.offsets = array("q", data["offsets"])
+        self.postings = {word: array("I", rows)
+                         for word, rows in data["postings"].items()}
+        self.category_postings = {
+            category: array("I", rows)
+            for category, rows in data["categories"].items()
+        }
+        self.replay(data)
+        self._saved_rows = len(self.offsets)
+
+    def add(self, offset, fields):
+        category, description = fields[1], fields[3]
+        row = len(self.offsets)
+        self.offsets.append(offset)
+        self.category_postings.setdefault(category, array("I")).append(row)
+        words = TOKEN_PATTERN.findall(description.lower())
+        self.regex_matches += len(words)
+        for word in set(words):
+            self.postings.setdefault(word, array("I")).append(row)
+
+    def _word_rows(self, word):
+        """Returns the events containing a word, or any word starting with
+        it if the word ends with '*'."""
+        if not word.endswith("*"):
+            return set(self.postings.get(word, ()))
+        prefix = word[:-1]
+        rows = set()
+        for indexed_word, posting in self.postings.items():
+            if indexed_word.startswith(prefix):
+                rows.update(posting)
+        return rows
+
+    def query(self, words, mode="and", category=None):
+        """Finds the events that contain the given words.
+
+        Args:
+            words (list of str): lowercase words to look for. A word ending
+                with '*' matches every word that starts with it.
+            mode (str, optional): "and" to require every word, "or" to
+                require any of them. Default is "and".
+            category (str, optional): only return events of this category.
+
+        Returns:
+            list of int: the matching event numbers, in file order.
+        """
+        word_rows = [self._word_rows(word.lower()) for word in words]
+        if not word_rows:
+            rows = set(range(len(self.offsets)))
+        elif mode == "and":
+            rows = set.intersection(*word_rows)
+        elif mode == "or":
+            rows = set.union(*word_rows)
+        else:
+            raise ValueError(f"Unknown query mode \"{mode}\".")
+
+        if category is not None:
+            rows &= set(self.category_postings.get(category, ()))
+        return sorted(rows)
+
+    def find(self, keyword, event_type):
+        """Finds the events the way keyword_search() matches them: the
+        event type is a case-insensitive substring of the category and the
+        keyword is a case-insensitive substring of the description. The
+        posting lists narrow down the candidates and only those lines are
+        read to check the whole keyword.
+
+        Args:
+            keyword (str): text that the description has to contain.
+            event_type (str): text that the category has to contain.
+
+        Returns:
+            list of str: the matching lines, in file order.
+        """
+        keyword = keyword.lower()
+        event_type = event_type.lower()
+
+        rows = set()
+        for category, posting in self.category_postings.items():
+            if event_type in category.lower():
+                rows.update(posting)
+
+        # a word of the keyword can be part of a longer word in the
+        # description, so it matches every indexed word that contains it
+        words = TOKEN_PATTERN.findall(keyword)
+        _count("regex_matches", len(words))
+        for word in words:
+            word_rows = set()
+            for indexed_word, posting in self.postings.items():
+                if word in indexed_word:
+                    word_rows.update(posting)
+            rows &= word_rows
+
+        return [line for line in self.lines(sorted(rows))
+                if keyword in _split_event_line(line)[3].lower()]
+
+    def lines(self, rows):
+        """Reads the lines of the given events from the file.
+
+        Args:
+            rows (list of int): event numbers, e.g. from query().
+
+        Returns:
+            list of str: the stripped lines of those events.
+        """
+        lines = []
+        size = 0
+        with open(self.path, "rb") as file:
+            for row in rows:
+                file.seek(self.offsets[row])
+                line = file.readline()
+                size += len(line)
+                lines.append(line.decode("utf-8").strip())
+        _count("bytes_read", size)
+        return lines
+
+
+class TimeIndex(LogIndex):
+    """A sparse index from timestamps to byte offsets of a system events
+    log. Events are appended in timestamp order, so only the timestamp and
+    offset of every sample_every-th event are kept; a time range is found by
+    binary searching those samples and reading only the part of the file
+    between them. If an event is ever appended out of order the index
+    notices it and range queries fall back to reading the whole file.
+
+    Attributes:
+        sample_every (int): number of events between two samples.
+        sample_times (array of int): timestamp (seconds since the epoch) of
+            every sampled event.
+        sample_offsets (array of int): byte offset of every sampled event.
+        events (int): number of indexed events.
+        last_time (int or None): timestamp of the last indexed event.
+        ordered (bool): False if any event is older than the one before it.
+    """
+
+    suffix = ".time.json"
+
+    def __init__(self, path, sample_every=256):
+        super().__init__(path)
+        self.sample_every = sample_every
+        self.sample_times = array("q")
+        self.sample_offsets = array("q")
+        self.events = 0
+        self.last_time = None
+        self.ordered = True
+
+    def reset(self):
+        self.__init__(self.path, self.sample_every)
+
+    def add(self, offset, fields):
+        timestamp = parse_timestamp(fields[0])
+        if self.last_time is not None and timestamp < self.last_time:
+            self.ordered = False
+        if self.events % self.sample_every == 0:
+            self.sample_times.append(timestamp)
+            self.sample_offsets.append(offset)
+        self.events += 1
+        self.last_time = timestamp
+
+    def to_dict(self):
+        return {
+            "sample_every": self.sample_every,
+            "times": self.sample_times.tolist(),
+            "offsets": self.sample_offsets.tolist(),
+            "events": self.events,
+            "last_time": self.last_time,
+            "ordered": self.ordered,
+        }
+
+    def from_dict(self, data):
+        self.sample_every = data["sample_every"]
+        self.sample_times = array("q", data["times"])
+        self.sample_offsets = array("q", data["offsets"])
+        self.events = data["events"]
+        self.last_time = data["last_time"]
+        self.ordered = data["ordered"]
+
+    def between(self, start, end):
+        """Finds the events with start <= timestamp < end.
+
+        Args:
+            start (datetime or date): beginning of the range.
+            end (datetime or date): end of the range (not included).
+
+        Returns:
+            list of str: the stripped lines of the matching events, in file
+                order.
+        """
+        start = _to_epoch_seconds(start)
+        end = _to_epoch_seconds(end)
+
+        first_offset = 0
+        if self.ordered:
+            # the sample before the first one at or after start may still
+            # contain events in the range
+            sample = bisect_left(self.sample_times, start) - 1
+            if sample >= 0:
+                first_offset = self.sample_offsets[sample]
+
+        lines = []
+        with open(self.path, "rb") as file:
+            file.seek(first_offset)
+            offset = first_offset
+            for line in file:
+                if offset >= self.indexed_size:
+                    break
+                offset += len(line)
+                fields = _split_event_line(line.decode("utf-8"))
+                if fields is None:
+                    continue
+                timestamp = parse_timestamp(fields[0])
+                if timestamp >= end and self.ordered:
+                    break
+                if start <= timestamp < end:
+                    lines.append(FIELD_SEPARATOR.join(fields))
+        _count("bytes_read", offset - first_offset)
+        return lines
+
+    def on_date(self, day):
+        """Finds the events of one day (e.g. date(2024, 3, 14)).
+
+        Returns:
+            list of str: the stripped lines of that day's events.
+        """
+        return self.between(day, day + timedelta(days=1))
+
+    def on_month_day(self, month, day):
+        """Finds the events on a month and day of any year, the way the
+        "Time Frame" option of summary() looks them up.
+
+        Args:
+            month (int): month (1-12).
+            day (int): day of the month (1-31).
+
+        Returns:
+            list of str: the stripped lines of the matching events.
+        """
+        if not self.ordered:
+            return [line for line in self.between(date.min, date.max)
+                    if int(line[5:7]) == month and int(line[8:10]) == day]
+
+        lines = []
+        if self.events:
+            first_year = day_to_date(
+                self.sample_times[0] // SECONDS_PER_DAY
+            ).year
+            last_year = day_to_date(self.last_time // SECONDS_PER_DAY).year
+            for year in range(first_year, last_year + 1):
+                try:
+                    lines.extend(self.on_date(date(year, month, day)))
+                except ValueError:
+                    # e.g. February 29th of a year that is not a leap year
+                    continue
+        return lines
+
+
+class WarningPatternIndex(LogIndex):
+    """Running counts of the patterns of consecutive warning events of a
+    system events log, kept up to date incrementally like the other
+    indexes: only the last warnings are remembered (in a deque as long as
+    the longest pattern), and a pattern is counted once for every warning
+    that completes it.
+
+    Descriptions are dictionary-encoded, and a pattern is counted under one
+    integer that packs the codes of its descriptions code_bits bits apart
+    (the last warning in the lowest bits), so no tuples of strings are
+    kept, however many patterns there are.
+
+    Attributes:
+        lengths (list of int): the pattern lengths that are counted.
+        descriptions (list of str): every distinct warning description, by
+            code.
+        code_bits (int): bits per description code in a pattern's key; 16,
+            doubled if there are ever more descriptions than that holds.
+        recent (deque of int): codes of the last warnings.
+        counts (dict): pattern length -> {packed key: number of
+            occurrences}.
+    """
+
+    suffix = ".warnings.json"
+
+    def __init__(self, path, lengths=(3,)):
+        super().__init__(path)
+        self.lengths = sorted(set(lengths))
+        self.descriptions = []
+        self._codes = {}
+        self.code_bits = 16
+        self.recent = deque(maxlen=max(self.lengths))
+        self.counts = {length: {} for length in self.lengths}
+
+    def reset(self):
+        self.__init__(self.path, self.lengths)
+
+    def _code(self, description):
+        """Returns the code of a description, adding it if it is new."""
+        code = self._codes.get(description)
+        if code is None:
+            code = len(self.descriptions)
+            if code >> self.code_bits:
+                self._widen()
+            self._codes[description] = code
+            self.descriptions.append(sys.intern(description))
+        return code
+
+    def _widen(self):
+        """Doubles code_bits, packing every counted pattern again."""
+        old_bits = self.code_bits
+        self.code_bits *= 2
+        self.counts = {
+            length: {self._pack(self._unpack(key, length, old_bits)): num
+                     for key, num in counts.items()}
+            for length, counts in self.counts.items()
+        }
+
+    def _pack(self, codes):
+        """Packs description codes (first warning first) into a key."""
+        key = 0
+        for code in codes:
+            key = key << self.code_bits | code
+        return key
+
+    def _unpack(self, key, length, code_bits=None):
+        """Returns the description codes (first warning first) of a key."""
+        code_bits = self.code_bits if code_bits is None else code_bits
+        mask = (1 << code_bits) - 1
+        return [key >> (code_bits * position) & mask
+                for position in range(length - 1, -1, -1)]
+
+    def add(self, offset, fields):
+        if fields[1] != "Warning":
+            return
+        self.recent.append(self._code(fields[3]))
+        # the key of the last n warnings extends the key of the last n - 1
+        key = 0
+        for length, code in enumerate(reversed(self.recent), start=1):
+            key |= code << (self.code_bits * (length - 1))
+            counts = self.counts.get(length)
+            if counts is not None:
+                counts[key] = counts.get(key, 0) + 1
+
+    def to_dict(self):
+        return {
+            "lengths": self.lengths,
+            "descriptions": self.descriptions,
+            "code_bits": self.code_bits,
+            "recent": list(self.recent),
+            "counts": {str(length): list(counts.items())
+                       for length, counts in self.counts.items()},
+        }
+
+    def from_dict(self, data):
+        self.__init__(self.path, data["lengths"])
+        for description in data["descriptions"]:
+            self._code(description)
+        self.code_bits = data["code_bits"]
+        self.recent.extend(data["recent"])
+        for length, counts in data["counts"].items():
+            self.counts[int(length)] = {key: num for key, num in counts}
+
+    def patterns(self, length):
+        """Returns the counts of the patterns of one length. A length that
+        was not counted yet is added to the index, which reads the file
+        again once.
+
+        Args:
+            length (int): number of warning events in a pattern.
+
+        Returns:
+            dict: tuple of length ("Warning", description) events -> number
+                of occurrences, in order of first occurrence.
+        """
+        if length not in self.counts:
+            self.__init__(self.path, self.lengths + [length])
+            self.refresh()
+        return {
+            tuple(("Warning", self.descriptions[code])
+                  for code in self._unpack(key, length)): num
+            for key, num in self.counts[length].items()
+        }
+
+
+class RollupIndex(JournaledIndex):
+    """Precomputed counts of the events of a system events log by day, hour
+    and category. The counts are kept up to date like the other indexes, by
+    reading only the lines appended since the last update, so summary and
+    activity queries read the rollups instead of the log. A rollup can also
+    be built in bulk from the parsed events (see from_store()).
+
+    Saving after an append does not rewrite every count: only the counts
+    added since the last save are appended to the journal,
+    "<path>.rollup.journal" (see JournaledIndex).
+
+    Attributes:
+        categories (list of str): every category, by code.
+        counts (dict): (days since 1970-01-01, hour, category code) ->
+            number of events.
+    """
+
+    suffix = ".rollup.json"
+    journal_suffix = ".rollup.journal"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.categories = []
+        self._codes = {}
+        self.counts = {}
+        # counts added since the last save
+        self._delta = {}
+
+    def journal_entry(self):
+        return {
+            "categories": self.categories,
+            "counts": [list(key) + [num] for key, num in self._delta.items()],
+        }
+
+    def clear_journal_entry(self):
+        self._delta = {}
+
+    def replay_entry(self, entry):
+        for category in entry["categories"]:
+            self._code(category)
+        for day, hour, code, num in entry["counts"]:
+            key = (day, hour, code)
+            self.counts[key] = self.counts.get(key, 0) + num
+
+    @classmethod
+    def from_store(cls, path, store):
+        """Builds the rollups of a log file from its parsed events in one
+        pass over the columns, instead of line by line.
+
+        Args:
+            path (str): path to the system events file.
+            store (EventStore): the parsed events of the file.
+
+        Returns:
+            RollupIndex: the rollups of the events of the store.
+        """
+        import numpy as np
+
+        index = cls(path)
+        for category in store.categories:
+            index._code(category)
+        hours = np.frombuffer(store.timestamps, dtype=np.int64) // 3600
+        codes = np.frombuffer(store.category_codes, dtype=np.uint16)
+        # one key per (hour since the epoch, category), codes fit in 16 bits
+        keys, counts = np.unique(hours * 65536 + codes, return_counts=True)
+        for key, num in zip(keys.tolist(), counts.tolist()):
+            hour_number, code = divmod(key, 65536)
+            index.counts[divmod(hour_number, 24) + (code,)] = num
+        index.indexed_size = store.indexed_size
+        index.fingerprint = prefix_fingerprint(path, store.indexed_size)
+        index.mtime_ns = os.stat(path).st_mtime_ns
+        return index
+
+    def _code(self, category):
+        """Returns the code of a category, adding it if it is new."""
+        code = self._codes.get(category)
+        if code is None:
+            code = self._codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def add(self, offset, fields):
+        timestamp = fields[0]
+        key = (_day_number(timestamp[:10]), int(timestamp[11:13]),
+               self._code(fields[1]))
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self._delta[key] = self._delta.get(key, 0) + 1
+
+    def to_dict(self):
+        return {
+            "categories": self.categories,
+            "counts": [list(key) + [num] for key, num in self.counts.items()],
+        }
+
+    def from_dict(self, data):
+        self.reset()
+        for category in data["categories"]:
+            self._code(category)
+        self.counts = {(day, hour, code): num
+                       for day, hour, code, num in data["counts"]}
+        self.replay(data)
+
+    def category_counts(self):
+        """Returns category -> number of events."""
+        counts = {}
+        for (_, _, code), num in self.counts.items():
+            category = self.categories[code]
+            counts[category] = counts.get(category, 0) + num
+        return counts
+
+    def month_counts(self):
+        """Returns month (1-12) -> number of events, in month order."""
+        counts = {}
+        for day, num in self.day_counts().items():
+            month = day_to_date(day).month
+            counts[month] = counts.get(month, 0) + num
+        return {month: counts[month] for month in sorted(counts)}
+
+    def day_counts(self, category=None):
+        """Returns days since 1970-01-01 -> number of events (of one
+        category if given), in day order."""
+        code = None if category is None else self._codes.get(category, -1)
+        counts = {}
+        for (day, _, event_code), num in self.counts.items():
+            if code is None or event_code == code:
+                counts[day] = counts.get(day, 0) + num
+        return {day: counts[day] for day in sorted(counts)}
+
+    def month_day_counts(self, month, day):
+        """Returns category -> number of events on a day of the year in any
+        year."""
+        counts = {}
+        for (day_number, _, code), num in self.counts.items():
+            event_date = day_to_date(day_number)
+            if event_date.month == month and event_date.day == day:
+                category = self.categories[code]
+                counts[category] = counts.get(category, 0) + num
+        return counts
+
+
+def _to_epoch_seconds(moment):
+    """Converts a date or datetime into seconds since the epoch."""
+    if isinstance(moment, datetime):
+        return parse_timestamp(moment.strftime("%Y-%m-%d %H:%M:%S"))
+    return _day_number(moment.isoformat()) * SECONDS_PER_DAY
+
+
+class MappedEventLog:
+    """A zero-copy view of a system events log. The file is memory-mapped
+    and the line and field boundaries are found by scanning the raw bytes
+    for newlines and '|' separators with NumPy, so no string is created per
+    line or per field. Fields are only decoded when they are used, and the
+    counts below work directly on the bytes.
+
+    Attributes:
+        path (str): path to the system events file.
+        buffer (ndarray): the bytes of the file (uint8, shares the mapping).
+        starts (ndarray): byte offset where each event's line starts.
+        field_bounds (ndarray): (events, 4, 2) array with the [start, end)
+            byte range of the timestamp, category, ID and description of
+            every event.
+    """
+
+    def __init__(self, path):
+        import numpy as np
+
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # an empty file cannot be mapped
+        self._map = (mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                     if size else None)
+        self.buffer = (np.frombuffer(self._map, dtype=np.uint8) if size
+                       else np.zeros(0, dtype=np.uint8))
+
+        newlines = np.flatnonzero(self.buffer == ord("\n"))
+        line_starts = np.concatenate(([0], newlines + 1))
+        line_ends = np.concatenate((newlines, [len(self.buffer)]))
+        pipes = np.flatnonzero(self.buffer == ord("|"))
+
+        # an event line has (at least) the three separators of its fields
+        first_pipe = np.searchsorted(pipes, line_starts)
+        pipe_count = np.searchsorted(pipes, line_ends) - first_pipe
+        complete = pipe_count >= 3
+        self.starts = line_starts[complete]
+        first_pipe = first_pipe[complete]
+        ends = line_ends[complete]
+        # ignore a '\r' of Windows line endings
+        ends = ends - (self.buffer[np.maximum(ends - 1, 0)] == ord("\r"))
+
+        separators = pipes[first_pipe[:, None] + np.arange(3)]
+        self.field_bounds = np.stack([
+            np.stack([self.starts, separators[:, 0] - 1], axis=1),
+            np.stack([separators[:, 0] + 2, separators[:, 1] - 1], axis=1),
+            np.stack([separators[:, 1] + 2, separators[:, 2] - 1], axis=1),
+            np.stack([separators[:, 2] + 2, ends], axis=1),
+        ], axis=1)
+
+        # like the other readers (see _split_event_line()), skip the lines
+        # with an invalid timestamp or ID
+        last = max(len(self.buffer) - 1, 0)
+        valid = self.field_bounds[:, 0, 1] - self.field_bounds[:, 0, 0] == 19
+        valid &= _timestamps_from_digits(self.buffer[
+            np.minimum(self.starts[:, None] + np.arange(19), last)
+        ])[0]
+        id_starts = self.field_bounds[:, 2, 0]
+        id_lengths = self.field_bounds[:, 2, 1] - id_starts
+        valid &= ((id_lengths > 2)
+                  & (self.buffer[np.minimum(id_starts, last)] == ord("I"))
+                  & (self.buffer[np.minimum(id_starts + 1, last)] == ord("D")))
+        # the digits are checked for all the IDs of the same length at once
+        candidates = np.flatnonzero(valid)
+        candidates = candidates[np.argsort(id_lengths[candidates],
+                                           kind="stable")]
+        lengths, group_starts = np.unique(id_lengths[candidates],
+                                          return_index=True)
+        for length, rows in zip(lengths, np.split(candidates,
+                                                  group_starts[1:])):
+            digits = self.buffer[id_starts[rows, None]
+                                 + np.arange(2, length)]
+            valid[rows] = ((digits - np.uint8(ord("0"))) <= 9).all(axis=1)
+        self.starts = self.starts[valid]
+        self.field_bounds = self.field_bounds[valid]
+        _count("bytes_read", size)
+        _count("lines_parsed", len(self.starts))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        return EventView(self, index)
+
+    def __iter__(self):
+        return (EventView(self, index) for index in range(len(self)))
+
+    def field(self, index, field_number):
+        """Decodes one field (0 timestamp, 1 category, 2 ID, 3 description)
+        of one event."""
+        start, end = self.field_bounds[index, field_number]
+        return bytes(self.buffer[start:end]).decode("utf-8").strip()
+
+    def count_field(self, field_number):
+        """Counts the distinct values of a field (e.g. 1 for categories)
+        without decoding it for every event.
+
+        Returns:
+            dict: decoded field value -> number of events.
+        """
+        import numpy as np
+
+        starts = self.field_bounds[:, field_number, 0]
+        lengths = self.field_bounds[:, field_number, 1] - starts
+        counts = {}
+        for length in np.unique(lengths):
+            group = starts[lengths == length]
+            # pack the bytes of every value into 64-bit words (exact, no
+            # hashing), then count equal rows of words
+            words = []
+            for word_start in range(0, length, 8):
+                word = np.zeros(len(group), dtype=np.uint64)
+                for position in range(word_start, min(word_start + 8, length)):
+                    word = (word << np.uint64(8)) | self.buffer[
+                        group + position
+                    ].astype(np.uint64)
+                words.append(word)
+
+            order = np.lexsort(words[::-1])
+            sorted_words = np.stack([word[order] for word in words])
+            new_value = np.ones(len(group), dtype=bool)
+            new_value[1:] = (sorted_words[:, 1:]
+                             != sorted_words[:, :-1]).any(axis=0)
+            first_rows = np.flatnonzero(new_value)
+            value_counts = np.diff(np.append(first_rows, len(group)))
+
+            for first_row, num in zip(first_rows, value_counts):
+                start = group[order[first_row]]
+                key = bytes(self.buffer[start:start + length]).decode(
+                    "utf-8"
+                ).strip()
+                counts[key] = counts.get(key, 0) + int(num)
+        return counts
+
+    def _digits(self, offset, width):
+        """Reads a number of fixed position in every timestamp."""
+        import numpy as np
+
+        number = np.zeros(len(self), dtype=np.int64)
+        for position in range(offset, offset + width):
+            number = number * 10 + (self.buffer[self.starts + position] - 48)
+        return number
+
+    def months(self):
+        """Returns the month (1-12) of every event as an array."""
+        return self._digits(5, 2)
+
+    def timestamps(self):
+        """Returns the timestamp of every event as a datetime64[s] array
+        (see datetime64_from_digits()).
+
+        Raises:
+            ValueError: If a timestamp is not a valid date and time.
+        """
+        import numpy as np
+
+        bounds = self.field_bounds[:, 0]
+        if (bounds[:, 1] - bounds[:, 0] != 19).any():
+            raise ValueError("Invalid timestamp in the log.")
+        return datetime64_from_digits(
+            self.buffer[self.starts[:, None] + np.arange(19)]
+        )
+
+    def hours(self):
+        """Returns the hour (0-23) of every event as an array."""
+        return self._digits(11, 2)
+
+    def date_counts(self):
+        """Counts the events per day.
+
+        Returns:
+            dict: 'YYYY-MM-DD' -> number of events.
+        """
+        import numpy as np
+
+        days = self._digits(0, 4) * 10000 + self.months() * 100 + (
+            self._digits(8, 2)
+        )
+        values, counts = np.unique(days, return_counts=True)
+        return {
+            f"{day // 10000:04d}-{day // 100 % 100:02d}-{day % 100:02d}":
+            int(num) for day, num in zip(values, counts)
+        }
+
+    def find_id(self, event_id):
+        """Finds the events with an ID (e.g. 'ID042') by comparing bytes.
+
+        Returns:
+            list of int: the positions of the matching events.
+        """
+        import numpy as np
+
+        target = np.frombuffer(event_id.encode("utf-8"), dtype=np.uint8)
+        starts = self.field_bounds[:, 2, 0]
+        lengths = self.field_bounds[:, 2, 1] - starts
+        candidates = np.flatnonzero(lengths == len(target))
+        rows = self.buffer[starts[candidates, None] + np.arange(len(target))]
+        return candidates[(rows == target).all(axis=1)].tolist()
+
+    def close(self):
+        """Releases the mapping and closes the file."""
+        self.buffer = self.field_bounds = self.starts = None
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EventView:
+    """One event of a MappedEventLog. Only the position of the event is
+    stored; each field is decoded from the mapped bytes when it is read."""
+
+    __slots__ = ("log", "index")
+
+    def __init__(self, log, index):
+        self.log = log
+        self.index = index
+
+    @property
+    def timestamp(self):
+        return self.log.field(self.index, 0)
+
+    @property
+    def category(self):
+        return self.log.field(self.index, 1)
+
+    @property
+    def event_id(self):
+        return self.log.field(self.index, 2)
+
+    @property
+    def description(self):
+        return self.log.field(self.index, 3)
+
+    @property
+    def offset(self):
+        """Byte offset of the event's line in the file."""
+        return int(self.log.starts[self.index])
+
+
+def mine_sequences(items, max_length=10, min_support=2, top_k=3):
+    """Finds the most frequent runs of consecutive items in a sequence.
+
+    Sequences are grown one item at a time, level by level. Items are
+    dictionary-encoded to small integers kept in a packed array, and every
+    start point keeps a rolling key for the run beginning there (the run's
+    id times the vocabulary size plus the next item's code), so extending a
+    run costs O(1) instead of slicing a new tuple. Only start points whose
+    run is repeated at least min_support times are extended to the next
+    length, which keeps the total work close to linear in the number of
+    events; those runs get dense ids, so the keys always fit in 64 bits and
+    the start points and ids are held in arrays rather than dictionaries.
+
+    Args:
+        items (sequence): hashable items (e.g. event descriptions) in the
+            order they occurred.
+        max_length (int, optional): longest run to look for. Default is 10.
+        min_support (int, optional): minimum number of occurrences for a run
+            to be kept. Default is 2.
+        top_k (int, optional): number of runs to return, or None for all of
+            them. Default is 3.
+
+    Returns:
+        list of tuples: (run, occurrences) pairs where run is a tuple of
+            items, sorted by occurrences (most common first), then by length
+            and then by the position of the first occurrence.
+    """
+    codes_by_item = {}
+    codes = array("I", (codes_by_item.setdefault(item, len(codes_by_item))
+                        for item in items))
+    vocabulary = list(codes_by_item)
+    base = max(len(vocabulary), 1)
+    if base <= 1 << 16:
+        codes = array("H", codes)
+
+    # the runs being grown: where each one starts, and an id of its items
+    # (the same for every run of the same items; at length 1, the code)
+    starts = array("q", range(len(codes) - 1))
+    run_ids = array("q", codes[:-1])
+    found = []
+
+    for length in range(2, max_length + 1):
+        # the start points are in order, so the runs that still fit are a
+        # prefix of them
+        kept = bisect_right(starts, len(codes) - length)
+        starts = starts[:kept]
+        last_codes = codes[length - 1:]
+        # run id * base + the next code, without a list of Python ints
+        keys = array("q", map(add, map(mul, run_ids, repeat(base)),
+                              map(last_codes.__getitem__, starts)))
+
+        counts = Counter(keys)
+        # the last write wins, so going backwards keeps the first start
+        first_seen = dict(zip(reversed(keys), reversed(starts)))
+
+        found.extend(
+            (count, length, first_seen[key])
+            for key, count in counts.items() if count >= min_support
+        )
+
+        # only repeated runs can be the prefix of a longer repeated run
+        repeated_ids = {}
+        for key, count in counts.items():
+            if count >= min_support:
+                repeated_ids[key] = len(repeated_ids)
+        if not repeated_ids:
+            break
+        repeated = array("b", map(repeated_ids.__contains__, keys))
+        starts = array("q", compress(starts, repeated))
+        run_ids = array("q", map(repeated_ids.__getitem__,
+                                 compress(keys, repeated)))
+
+    found.sort(key=lambda entry: (-entry[0], entry[1], entry[2]))
+    if top_k is not None:
+        found = found[:top_k]
+
+    return [
+        (tuple(vocabulary[code] for code in
+               codes[start_point:start_point + length]), count)
+        for count, length, start_point in found
+    ]
+
+
+EVENT_CATEGORIES = {
+    "Error":["Represents errors that occur on the system.",
+             "EX: Appllication \"XYX\" failed to start"],
+    "Warning":["Indicates warning conditions.",
+               "EX: Temperature warning: CPU overheating."],
+    "Update":["Represents instances of updates made on the system.",
+              "EX: Driver update for graphics card completed"],
+    "Security":["Security events that occured on the system",
+                "EX: Unauthorized login attempt"]
+}
+DEFAULT_CHANGE_LOG_FILE = "default_system_made_change_log.txt"
+# the event types counted by summary()
+SUMMARY_EVENTS = ["Update", "Files", "Error", "Warning", "Security"]
+
+
+def format_given_date_and_time(date, time):
+    """Formats the provided date and time into a standard 
+        'YYYY-MM-DD HH:MM:00' format.
+            Primary author of function: Shemar Anglin
+            Technique: N/A
+            
+    Args:
+        date (str): The date that is in MMDDYYYY format.
+        time (str): The time that is in HHMM format.
+
+    Raises:
+        ValueError: If the date or time is invalid and/or not in the
+            expected ranges.
+
+    Returns:
+        str: The formatted date and time as one simple string.
+    """
+    
+    if len(date) != 8 or len(time) != 4:
+        raise ValueError("INVALID DATE AND/OR TIME FORMAT!\n")
+    else:
+        month, day, year = date[:2], date[2:4], date[4:]
+        hour, minute = time[:2], time[2:]
+
+        if not (0 <= int(hour) < 24 and 0 <= int(minute) < 60):
+            raise ValueError(
+                "INVALID TIME! Hour must be 00-23, minute 00-59.\n"
+            )
+        # the month and the day must make a real date (e.g. not 13452024)
+        try:
+            datetime.strptime(date + time, "%m%d%Y%H%M")
+        except ValueError:
+            raise ValueError(
+                "INVALID DATE! Month must be 01-12 and the day must exist "
+                "in that month.\n"
+            )
+        formatted_date = f"{year}-{month}-{day}"
+        formatted_time = f"{hour}:{minute}:00"
+        return formatted_date + " " + formatted_time
+
+
+def get_last_event_information(file_path, use_sidecar=False):
+    """Retrieves the last date, time, and ID of the last event.
+            Primary author of function: Shemar Anglin
+            Technique: With statements
+
+    Args:
+        file_path (str): the path to the file where system events are logged
+        use_sidecar (bool, optional): if True, use the offset remembered in
+            the "<file_path>.last.json" sidecar when it is up to date.
+            Default is False.
+
+    Raises:
+        FileNotFoundError: If teh specified file is not found.
+
+    Returns:
+        tuple: the date/time and ID of the last event. Reads the last event
+            of the event file (from the sidecar's offset when it is up to
+            date, otherwise backward from the end of the file) to extract
+            information.
+    """
+    
+    try:
+        saved = load_last_event_sidecar(file_path) if use_sidecar else None
+        if saved is not None:
+            with open(file_path, 'rb') as file:
+                file.seek(saved["offset"])
+                final_entry = file.readline().decode("utf-8").strip().split(
+                    " | "
+                )
+        else:
+            final_entry, _ = read_last_event(file_path)
+
+        final_date_time = final_entry[0]
+        final_id_of_final_line = final_entry[2]
+
+        return final_date_time, final_id_of_final_line
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File \"{file_path}\" not found. Try again.")
+
+
+def validate_event(event, number=1):
+    """Checks and formats an event to add (see
+    SystemEventsManager.add_events()).
+
+    Args:
+        event (dict): the event, with the keys "date" (MMDDYYYY), "time"
+            (HHMM), "category" (one of EVENT_CATEGORIES), "priority" ("High"
+            or "Low"), "description" and "user_name".
+        number (int, optional): position of the event, for the error
+            messages. Default is 1.
+
+    Raises:
+        ValueError: If the event is invalid.
+
+    Returns:
+        tuple: the formatted date and time, category, priority, description
+            and user name of the event.
+    """
+    try:
+        formatted_date_and_time = format_given_date_and_time(
+            str(event["date"]).strip(), str(event["time"]).strip()
+        )
+        event_type = str(event["category"]).strip().capitalize()
+        priority = str(event["priority"]).strip().capitalize()
+        description = str(event["description"]).strip()
+        user_name = str(event["user_name"]).strip()
+    except KeyError as missing:
+        raise ValueError(f"Event {number} is missing {missing}.")
+    except ValueError as error:
+        raise ValueError(f"Event {number}: {error}".strip())
+
+    if event_type not in EVENT_CATEGORIES:
+        raise ValueError(
+            f"Event {number}: invalid category \"{event_type}\". "
+            f"Choose predefined categories: {list(EVENT_CATEGORIES)}"
+        )
+    if priority not in ["High", "Low"]:
+        raise ValueError(
+            f"Event {number}: invalid priority level \"{priority}\", "
+            "enter \"High\" or \"Low\""
+        )
+    return (formatted_date_and_time, event_type, priority, description,
+            user_name)
+
+
+def append_events(file_path, validated, use_sidecar=False, sync=False):
+    """Gives validated events the next IDs and appends them to a log file
+    with a single write. The last ID is read and the events are written
+    while holding a FileLock on the log, so concurrent writers, in this
+    process or in others, never hand out the same ID.
+
+    Args:
+        file_path (str): the path to the file where system events are
+            logged.
+        validated (list of tuples): the events, as returned by
+            validate_event().
+        use_sidecar (bool, optional): if True, read and update the
+            "<file_path>.last.json" sidecar. Default is False.
+        sync (bool, optional): if True, the events are flushed to disk
+            (fsync) before the lock is released. Default is False.
+
+    Raises:
+        FileNotFoundError: If the events file is not found.
+
+    Returns:
+        list of str: the IDs given to the events, in order.
+    """
+    try:
+        file = open(file_path, "r+b")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File \"{file_path}\" not found. Try again.")
+
+    with file, FileLock(file):
+        _, last_id = get_last_event_information(file_path, use_sidecar)
+        first_number = int(last_id[2:]) + 1
+        new_ids = [f"ID{first_number + offset}"
+                   for offset in range(len(validated))]
+
+        lines = [
+            f"{formatted_date_and_time} | {event_type} | {event_id} | "
+            f"{description}\n".encode("utf-8")
+            for (formatted_date_and_time, event_type, _, description, _),
+            event_id in zip(validated, new_ids)
+        ]
+        # every event line ends with a newline; only add one in front if
+        # the file was not written that way
+        prefix = b"" if ends_with_newline(file_path) else b"\n"
+        size = file.seek(0, os.SEEK_END)
+        last_line_offset = (size + len(prefix)
+                            + sum(len(line) for line in lines[:-1]))
+        file.write(prefix + b"".join(lines))
+        file.flush()
+        if sync:
+            os.fsync(file.fileno())
+        if use_sidecar:
+            save_last_event_sidecar(file_path, new_ids[-1], last_line_offset)
+    return new_ids
+
+
+class GroupCommitAppender:
+    """Adds events sent by many producers (threads) to a log file in group
+    commits. Submitted events wait in a buffer, and a background thread
+    appends everything submitted during one interval together: one locked
+    write with one fsync (see append_events()) and one change log write.
+    Producers in other processes can use their own appender on the same
+    file; the file locks keep the IDs unique.
+
+    The futures of a commit are resolved as soon as its events are on
+    disk. If the change log cannot be written afterwards, the events are
+    not reported as failed (a producer that retried would add them
+    twice); their change log entries are kept in unlogged, the error in
+    change_log_error, and the entries are written with the next commit.
+
+    Attributes:
+        file_path (str): the path to the file where system events are
+            logged.
+        interval (float): seconds the events of a group commit are
+            collected for.
+        change_log_file (str): the path to the file where changes are
+            recorded.
+        use_sidecar (bool): if True, read and update the
+            "<file_path>.last.json" sidecar.
+        commits (int): number of group commits made so far.
+        unlogged (list of tuples): change log entries of committed events
+            that could not be written yet.
+        change_log_error (OSError or None): the error of the last change
+            log write that failed, None once the change log is up to date.
+    """
+
+    def __init__(self, file_path, interval=0.01, change_log_file=None,
+                 use_sidecar=False):
+        import threading
+
+        self.file_path = file_path
+        self.interval = interval
+        self.change_log_file = (DEFAULT_CHANGE_LOG_FILE
+                                if change_log_file is None
+                                else change_log_file)
+        self.use_sidecar = use_sidecar
+        self.commits = 0
+        self.unlogged = []
+        self.change_log_error = None
+        self._change_log = ChangeLogWriter(self.change_log_file)
+        # (validated event, Future of its ID) of the next group commit
+        self._pending = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, event):
+        """Queues an event for the next group commit.
+
+        Args:
+            event (dict): the event (see validate_event()).
+
+        Raises:
+            ValueError: If the event is invalid or the appender is closed.
+
+        Returns:
+            Future: resolves to the ID given to the event once it is on
+                disk, or raises the error of its commit.
+        """
+        from concurrent.futures import Future
+
+        validated = validate_event(event)
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise ValueError("The appender is closed.")
+            self._pending.append((validated, future))
+            self._condition.notify_all()
+        return future
+
+    def add(self, event):
+        """Adds an event and waits for its group commit.
+
+        Args:
+            event (dict): the event (see validate_event()).
+
+        Raises:
+            ValueError: If the event is invalid or the appender is closed.
+            OSError: If the events could not be written.
+
+        Returns:
+            str: the ID given to the event.
+        """
+        return self.submit(event).result()
+
+    def _run(self):
+        """Makes a group commit every interval while events are waiting."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                # let the other producers join the commit
+                deadline = perf_counter() + self.interval
+                while not self._closed:
+                    remaining = deadline - perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch, self._pending = self._pending, []
+            self._commit(batch)
+
+    def _commit(self, batch):
+        """Appends a batch of events, resolves their futures and then
+        records them in the change log."""
+        try:
+            new_ids = append_events(self.file_path,
+                                    [validated for validated, _ in batch],
+                                    self.use_sidecar, sync=True)
+        except Exception as error:
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        self.commits += 1
+        for (_, future), event_id in zip(batch, new_ids):
+            future.set_result(event_id)
+
+        self.unlogged.extend(
+            (user_name, "Add Event", priority, f"Added '{event_type}' Event")
+            for (_, event_type, priority, _, user_name), _ in batch
+        )
+        self._write_change_log()
+
+    def _write_change_log(self):
+        """Writes the change log entries of the committed events."""
+        try:
+            self._change_log.record_many(self.unlogged)
+        except OSError as error:
+            self.change_log_error = error
+            return
+        self.unlogged = []
+        self.change_log_error = None
+
+    def close(self):
+        """Commits the waiting events and stops the background thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        if self.unlogged:
+            # a last try for entries whose write failed
+            self._write_change_log()
+        self._change_log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SQLiteEventLog:
+    """A storage backend that keeps the events and change log entries of a
+    system events log in a SQLite database instead of a text file, so
+    queries use indexes rather than reading every line: the events table
+    is indexed on timestamp, category and event ID, and an FTS5 table
+    (trigram tokenizer) finds the descriptions that contain a keyword. The
+    database uses write-ahead logging (WAL), so readers do not block the
+    writer. Events are imported from a text log with import_log().
+
+    The events table keeps the file order as rowid, the timestamp as
+    seconds since the epoch and the event ID as its number, like
+    EventStore; the methods below return lines formatted like the log.
+
+    Attributes:
+        path (str): path to the database file.
+        full_text (bool): True if the FTS5 table is available; without it
+            keyword searches scan the descriptions.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS events (
+            timestamp INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            event_id INTEGER NOT NULL,
+            description TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS change_log (
+            number INTEGER PRIMARY KEY,
+            user_name TEXT NOT NULL,
+            change_type TEXT NOT NULL,
+            priority_level TEXT NOT NULL,
+            description TEXT NOT NULL
+        );
+    """
+    # index name -> indexed column of the events table
+    indexes = {"events_timestamp": "timestamp",
+               "events_category": "category",
+               "events_event_id": "event_id"}
+    full_text_schema = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS event_descriptions USING fts5(
+            description, content='events', content_rowid='rowid',
+            tokenize='trigram'
+        );
+    """
+    columns = "timestamp, category, event_id, description"
+
+    def __init__(self, path, create=False):
+        """Opens the database of a log.
+
+        Args:
+            path (str): path to the database file.
+            create (bool, optional): if True, a missing database is
+                created. Default is False.
+
+        Raises:
+            FileNotFoundError: If the database does not exist and create is
+                False.
+        """
+        import sqlite3
+
+        if not create and not os.path.exists(path):
+            raise FileNotFoundError(f"File \"{path}\" not found. Try again.")
+        self.path = path
+        # transactions are started explicitly (see _write())
+        self.connection = sqlite3.connect(path, isolation_level=None,
+                                          check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.schema)
+        self._create_indexes(self.connection)
+        try:
+            self.connection.executescript(self.full_text_schema)
+            self.full_text = True
+        except sqlite3.OperationalError:
+            # SQLite without FTS5 or before the trigram tokenizer (3.34)
+            self.full_text = False
+
+    def close(self):
+        """Closes the database."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write(self, statements):
+        """Runs statements(cursor) in one write transaction. The
+        transaction takes the database's write lock before it reads
+        anything, so concurrent writers see each other's events."""
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements(cursor)
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+        return result
+
+    def _create_indexes(self, cursor):
+        """Creates the indexes of the events table that do not exist."""
+        for name, column in self.indexes.items():
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON events ({column})"
+            )
+
+    def _lines(self, query, parameters=()):
+        """Yields the events selected by a query as log lines."""
+        for timestamp, category, event_id, description in (
+            self.connection.execute(query, parameters)
+        ):
+            yield FIELD_SEPARATOR.join((
+                format_timestamp(timestamp), category,
+                format_event_id(event_id), description
+            ))
+
+    def import_log(self, store, change_log_file=None):
+        """Imports the events of a text log, and optionally its change log,
+        into the empty database in one transaction.
+
+        Args:
+            store (EventStore): the parsed events of the log.
+            change_log_file (str, optional): path to the change log of the
+                log. Default is None (no change log entries).
+
+        Raises:
+            ValueError: If the database already has events.
+            FileNotFoundError: If the change log is not found.
+
+        Returns:
+            int: number of imported events.
+        """
+        entries = []
+        if change_log_file is not None:
+            with open(change_log_file, "r", encoding="utf-8") as change_log:
+                for line in change_log:
+                    number = _change_log_number(line)
+                    if number is not None:
+                        entries.append([number] + [
+                            field.strip() for field in
+                            line.split(FIELD_SEPARATOR, 4)[1:]
+                        ])
+
+        def statements(cursor):
+            if cursor.execute("SELECT 1 FROM events LIMIT 1").fetchone():
+                raise ValueError(f"\"{self.path}\" already has events.")
+            # sorting the whole table into each index once is several times
+            # faster than updating the indexes row by row
+            for name in self.indexes:
+                cursor.execute(f"DROP INDEX {name}")
+            cursor.executemany(
+                "INSERT INTO events VALUES (?, ?, ?, ?)",
+                zip(store.timestamps,
+                    map(store.categories.__getitem__, store.category_codes),
+                    store.ids,
+                    map(store.descriptions.__getitem__,
+                        store.description_codes))
+            )
+            self._create_indexes(cursor)
+            if self.full_text:
+                cursor.execute("INSERT INTO event_descriptions"
+                               "(event_descriptions) VALUES ('rebuild')")
+            cursor.executemany(
+                "INSERT OR REPLACE INTO change_log VALUES (?, ?, ?, ?, ?)",
+                entries
+            )
+
+        self._write(statements)
+        return len(store)
+
+    def append_events(self, validated):
+        """Adds validated events and their change log entries in one
+        transaction, numbering the events after the last event.
+
+        Args:
+            validated (list of tuples): the events, as returned by
+                validate_event().
+
+        Returns:
+            list of str: the IDs given to the events, in order.
+        """
+        def statements(cursor):
+            last = cursor.execute(
+                "SELECT event_id FROM events ORDER BY rowid DESC LIMIT 1"
+            ).fetchone()
+            first_number = (last[0] if last else 0) + 1
+            new_ids = []
+            for number, (formatted_date_and_time, event_type, priority,
+                         description, user_name) in enumerate(
+                validated, start=first_number
+            ):
+                cursor.execute(
+                    "INSERT INTO events VALUES (?, ?, ?, ?)",
+                    (parse_timestamp(formatted_date_and_time), event_type,
+                     number, description)
+                )
+                if self.full_text:
+                    cursor.execute(
+                        "INSERT INTO event_descriptions (rowid, description) "
+                        "VALUES (?, ?)", (cursor.lastrowid, description)
+                    )
+                cursor.execute(
+                    "INSERT INTO change_log (user_name, change_type, "
+                    "priority_level, description) VALUES (?, ?, ?, ?)",
+                    (user_name, "Add Event", priority,
+                     f"Added '{event_type}' Event")
+                )
+                new_ids.append(f"ID{number}")
+            return new_ids
+
+        return self._write(statements)
+
+    def category_counts(self):
+        """Returns category -> number of events."""
+        return dict(self.connection.execute(
+            "SELECT category, count(*) FROM events GROUP BY category"
+        ))
+
+    def _time_range(self):
+        """Returns the first and last timestamp, or None without events."""
+        first, last = self.connection.execute(
+            "SELECT min(timestamp), max(timestamp) FROM events"
+        ).fetchone()
+        return None if first is None else (first, last)
+
+    def month_counts(self):
+        """Returns month (1-12) -> number of events, in month order. Every
+        month of every year is counted on the timestamp index."""
+        counts = {}
+        time_range = self._time_range()
+        if time_range is None:
+            return counts
+        first_year = day_to_date(time_range[0] // SECONDS_PER_DAY).year
+        last_year = day_to_date(time_range[1] // SECONDS_PER_DAY).year
+        for year in range(first_year, last_year + 1):
+            for month in range(1, 13):
+                start = _to_epoch_seconds(date(year, month, 1))
+                end = _to_epoch_seconds(date(year + month // 12,
+                                             month % 12 + 1, 1))
+                num, = self.connection.execute(
+                    "SELECT count(*) FROM events "
+                    "WHERE timestamp >= ? AND timestamp < ?", (start, end)
+                ).fetchone()
+                if num:
+                    counts[month] = counts.get(month, 0) + num
+        return {month: counts[month] for month in sorted(counts)}
+
+    def lines(self, category):
+        """Yields the events of a category as log lines, in log order."""
+        yield from self._lines(
+            f"SELECT {self.columns} FROM events WHERE category = ? "
+            "ORDER BY rowid", (category,)
+        )
+
+    def month_day_lines(self, month, day):
+        """Yields the events on a day of the year in any year as log lines,
+        looking up that day of every year on the timestamp index."""
+        time_range = self._time_range()
+        if time_range is None:
+            return
+        first_year = day_to_date(time_range[0] // SECONDS_PER_DAY).year
+        last_year = day_to_date(time_range[1] // SECONDS_PER_DAY).year
+        for year in range(first_year, last_year + 1):
+            try:
+                start = _to_epoch_seconds(date(year, month, day))
+            except ValueError:
+                # e.g. February 29th of a year that is not a leap year
+                continue
+            yield from self._lines(
+                f"SELECT {self.columns} FROM events "
+                "WHERE timestamp >= ? AND timestamp < ? ORDER BY rowid",
+                (start, start + SECONDS_PER_DAY)
+            )
+
+    def search(self, keyword, event_type):
+        """Yields the events whose category contains event_type and whose
+        description contains keyword, ignoring case, as log lines in log
+        order (see SystemEventsManager.search_events())."""
+        def like(text):
+            escaped = (text.replace("\\", "\\\\").replace("%", "\\%")
+                       .replace("_", "\\_"))
+            return f"%{escaped}%"
+
+        if self.full_text and len(keyword) >= 3:
+            # the trigram index finds substrings of three or more
+            # characters; the keyword is matched as one quoted phrase
+            yield from self._lines(
+                f"SELECT {self.columns} FROM events WHERE rowid IN ("
+                "SELECT rowid FROM event_descriptions "
+                "WHERE event_descriptions MATCH ?) "
+                "AND category LIKE ? ESCAPE '\\' ORDER BY rowid",
+                ('"' + keyword.replace('"', '""') + '"', like(event_type))
+            )
+            return
+        yield from self._lines(
+            f"SELECT {self.columns} FROM events WHERE description LIKE ? "
+            "ESCAPE '\\' AND category LIKE ? ESCAPE '\\' ORDER BY rowid",
+            (like(keyword), like(event_type))
+        )
+
+
+# storage name -> backend class used by SystemEventsManager for that
+# storage; "text" (the log file itself) is built into the manager
+STORAGE_BACKENDS = {"sqlite": SQLiteEventLog}
+
+
+# the Instrumentation of the instrumented call in progress, if any
+_active_instrumentation = None
+# inspect.CO_GENERATOR; inspect itself takes long to import
+CO_GENERATOR = 0x20
+
+
+def _count(name, amount):
+    """Adds to a counter ("bytes_read", "lines_parsed" or "regex_matches")
+    of the instrumented calls in progress. Called once per chunk or file
+    rather than per line, and does nothing without instrumentation."""
+    if _active_instrumentation is not None:
+        _active_instrumentation.count(name, amount)
+
+
+def _peak_rss_bytes():
+    """Returns the peak resident set size of the process in bytes, or None
+    where the resource module is not available (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Instrumentation:
+    """Opt-in measurements of SystemEventsManager method calls. Every call
+    of an instrumented method produces a record that is passed to each
+    sink, and is added to per-method totals.
+
+    A record is a dictionary with the "method", its wall time ("seconds"),
+    the "bytes_read", "lines_parsed" and "regex_matches" of the call
+    (including the methods it called), its "depth" (0 for a call made from
+    outside the manager), the process's "peak_rss_bytes" and, with
+    trace_memory, the peak of the memory allocated by Python during the
+    outermost call ("peak_traced_bytes", measured with tracemalloc).
+
+    Attributes:
+        sinks (list of callable): called with every record, e.g. a
+            function, JsonFileSink or PrometheusFileSink.
+        trace_memory (bool): whether to trace Python allocations, which
+            makes the calls noticeably slower.
+        totals (dict): method -> {"calls": int, "seconds": float,
+            "bytes_read": int, "lines_parsed": int, "regex_matches": int}.
+    """
+
+    counters = ("bytes_read", "lines_parsed", "regex_matches")
+
+    def __init__(self, sinks=(), trace_memory=False):
+        self.sinks = list(sinks)
+        self.trace_memory = trace_memory
+        self.totals = {}
+        # counters of the calls in progress, outermost first
+        self._calls = []
+        self._started_tracing = False
+
+    def count(self, name, amount):
+        """Adds to a counter of every call in progress."""
+        for call in self._calls:
+            call[name] += amount
+
+    def begin(self, method):
+        """Starts measuring a call of a method."""
+        global _active_instrumentation
+        if not self._calls:
+            _active_instrumentation = self
+            if self.trace_memory:
+                import tracemalloc
+
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracing = True
+                tracemalloc.reset_peak()
+        call = {name: 0 for name in self.counters}
+        call["method"] = method
+        call["start"] = perf_counter()
+        self._calls.append(call)
+
+    def end(self):
+        """Finishes the innermost call and sends its record to the sinks."""
+        global _active_instrumentation
+        call = self._calls.pop()
+        record = {"method": call["method"],
+                  "seconds": perf_counter() - call["start"],
+                  "depth": len(self._calls),
+                  "peak_rss_bytes": _peak_rss_bytes()}
+        for name in self.counters:
+            record[name] = call[name]
+        if self.trace_memory:
+            import tracemalloc
+
+            record["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        if not self._calls:
+            _active_instrumentation = None
+            if self._started_tracing:
+                import tracemalloc
+
+                tracemalloc.stop()
+                self._started_tracing = False
+
+        totals = self.totals.setdefault(
+            record["method"], dict.fromkeys(("calls", "seconds")
+                                            + self.counters, 0)
+        )
+        totals["calls"] += 1
+        totals["seconds"] += record["seconds"]
+        for name in self.counters:
+            totals[name] += record[name]
+        for sink in self.sinks:
+            sink(record)
+
+
+class JsonFileSink:
+    """An Instrumentation sink that appends every record to a file as one
+    line of JSON (JSON Lines)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, record):
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+
+
+class PrometheusFileSink:
+    """An Instrumentation sink that keeps the per-method totals of this
+    process in a file in the Prometheus text exposition format, e.g. for
+    the node exporter's textfile collector. The file is replaced after
+    every record."""
+
+    metrics = (
+        ("calls", "counter", "Calls of a SystemEventsManager method."),
+        ("seconds", "counter", "Wall time spent in the method."),
+        ("bytes_read", "counter", "Bytes of log files read."),
+        ("lines_parsed", "counter", "Log lines parsed."),
+        ("regex_matches", "counter", "Regular expression matches."),
+        ("peak_rss_bytes", "gauge", "Peak resident set size."),
+    )
+
+    def __init__(self, path, prefix="system_events_method_"):
+        self.path = path
+        self.prefix = prefix
+        self.totals = {}
+
+    def __call__(self, record):
+        totals = self.totals.setdefault(
+            record["method"], {name: 0 for name, _, _ in self.metrics}
+        )
+        totals["calls"] += 1
+        for name in ("seconds",) + Instrumentation.counters:
+            totals[name] += record[name]
+        totals["peak_rss_bytes"] = max(totals["peak_rss_bytes"],
+                                       record["peak_rss_bytes"] or 0)
+
+        lines = []
+        for name, kind, help_text in self.metrics:
+            metric = self.prefix + name
+            if kind == "counter":
+                metric += "_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for method, values in sorted(self.totals.items()):
+                lines.append(f'{metric}{{method="{method}"}} {values[name]}')
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(temporary_path, self.path)
+
+
+def instrumented(method):
+    """Decorates a SystemEventsManager method so that its calls are
+    measured when the manager has an Instrumentation. Without one, the only
+    cost is checking the attribute. Generator methods are measured until
+    they are exhausted or closed."""
+    name = method.__name__
+
+    if method.__code__.co_flags & CO_GENERATOR:
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.instrumentation is None:
+                yield from method(self, *args, **kwargs)
+                return
+            self.instrumentation.begin(name)
+            try:
+                yield from method(self, *args, **kwargs)
+            finally:
+                self.instrumentation.end()
+        return wrapper
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.instrumentation is None:
+            return method(self, *args, **kwargs)
+        self.instrumentation.begin(name)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.instrumentation.end()
+    return wrapper
+
+
+def profile_call(function, mode, report_path):
+    """Runs a function under cProfile ("cpu") or tracemalloc ("memory") and
+    writes a text report, even if the function raises or exits.
+
+    Args:
+        function (callable): called without arguments.
+        mode (str): "cpu" or "memory".
+        report_path (str): file the report is written to.
+
+    Raises:
+        ValueError: If mode is unknown.
+
+    Returns:
+        the function's return value.
+    """
+    if mode == "cpu":
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(function)
+        finally:
+            with open(report_path, "w", encoding="utf-8") as report:
+                stats = pstats.Stats(profiler, stream=report)
+                stats.sort_stats("cumulative").print_stats(50)
+    if mode == "memory":
+        import tracemalloc
+
+        tracemalloc.start()
+        try:
+            return function()
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(report_path, "w", encoding="utf-8") as report:
+                report.write(f"Peak traced memory: {peak} bytes\n"
+                             f"Still allocated: {current} bytes\n\n"
+                             "Largest allocations by line:\n")
+                for statistic in snapshot.statistics("lineno")[:50]:
+                    report.write(f"{statistic}\n")
+    raise ValueError(f"Unknown profile mode \"{mode}\".")
+
+
+def pattern_label(pattern):
+    """Returns the text of a warning pattern, e.g. 'Disk full -> Retry'."""
+    return " -> ".join(description for _, description in pattern)
+
+
+def daily_totals(timestamps):
+    """Counts timestamps per day.
+
+    Args:
+        timestamps (sequence): 'YYYY-MM-DD HH:MM:SS' strings or a NumPy
+            datetime64 array.
+
+    Returns:
+        tuple: the days with events (datetime64[D] array, in order) and the
+            number of events on each of them (int64 array).
+    """
+    import numpy as np
+
+    days = np.asarray(timestamps, dtype="datetime64[s]").astype(
+        "datetime64[D]"
+    )
+    return np.unique(days, return_counts=True)
+
+
+class ReportRenderer:
+    """Renders charts to image files without a display, e.g. on a server.
+    The figures are drawn on matplotlib's Agg canvas without loading pyplot
+    or an interactive backend, and every kind of chart keeps one figure
+    that is cleared and drawn again for each report, so a batch of reports
+    does not pay for creating a figure per chart.
+
+    Attributes:
+        output_dir (str): directory the charts are written to; it is
+            created if needed.
+        formats (tuple of str): image formats written for every chart, e.g.
+            ("png", "svg").
+        dpi (int): resolution of the PNG images.
+        max_points (int): most points drawn on a timeline; longer timelines
+            are summed into bins of several days.
+    """
+
+    def __init__(self, output_dir, formats=("png",), dpi=100,
+                 max_points=1000):
+        self.output_dir = output_dir
+        self.formats = tuple(formats)
+        self.dpi = dpi
+        self.max_points = max_points
+        # chart kind -> Axes of the figure kept for it
+        self._axes = {}
+
+    def axes(self, kind, figsize):
+        """Returns the cleared axes of the figure kept for a kind of
+        chart, creating the figure on first use."""
+        axes = self._axes.get(kind)
+        if axes is not None:
+            axes.clear()
+            return axes
+
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        figure = Figure(figsize=figsize)
+        FigureCanvasAgg(figure)
+        axes = self._axes[kind] = figure.add_subplot()
+        return axes
+
+    def save(self, axes, name):
+        """Writes the figure of some axes in every format.
+
+        Args:
+            axes (Axes): axes returned by axes().
+            name (str): file name without extension.
+
+        Returns:
+            list of str: paths of the written files.
+        """
+        figure = axes.get_figure()
+        figure.tight_layout()
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        for image_format in self.formats:
+            path = os.path.join(self.output_dir, f"{name}.{image_format}")
+            figure.savefig(path, format=image_format, dpi=self.dpi)
+            paths.append(path)
+        return paths
+
+    def month_chart(self, month_counts, name):
+        """Draws the number of events of each month as bars.
+
+        Args:
+            month_counts (dict): month (1-12) -> number of events.
+            name (str): file name without extension.
+
+        Returns:
+            list of str: paths of the written files.
+        """
+        axes = self.axes("months", (8, 5))
+        months = sorted(month_counts)
+        axes.bar(months, [month_counts[month] for month in months])
+        axes.set_xticks(range(1, 13))
+        axes.set_xlabel("Month")
+        axes.set_ylabel("Number of Events")
+        axes.set_title("Events per Month")
+        axes.grid(True, axis="y")
+        return self.save(axes, name)
+
+    def pattern_chart(self, patterns, name, top=20):
+        """Draws the most frequent warning patterns as horizontal bars.
+
+        Args:
+            patterns (dict): warning pattern -> occurrences (see
+                SystemEventsManager.id_warning_patterns()).
+            name (str): file name without extension.
+            top (int, optional): number of patterns drawn. Default is 20.
+
+        Returns:
+            list of str: paths of the written files.
+        """
+        frequent = sorted(patterns.items(), key=lambda item: -item[1])[:top]
+        # one line of the label per warning, the most frequent at the top
+        labels = [pattern_label(pattern).replace(" -> ", " ->\n")
+                  for pattern, _ in reversed(frequent)]
+        axes = self.axes("patterns", (10, 6))
+        axes.get_figure().set_size_inches(
+            10, max(4, 1.5 + 0.2 * sum(len(pattern) for pattern, _ in frequent))
+        )
+        axes.barh(range(len(labels)), [count for _, count in
+                                       reversed(frequent)],
+                  color="skyblue")
+        axes.set_yticks(range(len(labels)), labels, fontsize=8)
+        axes.set_xlabel("Occurrences")
+        axes.set_ylabel("Warning Patterns")
+        axes.set_title("Most Frequent Warning Patterns")
+        return self.save(axes, name)
+
+    def timeline_chart(self, days, counts, name,
+                       title="Warning Events Over Time",
+                       ylabel="Number of Warnings"):
+        """Draws daily counts as a timeline.
+
+        Args:
+            days (datetime64[D] array): the days with events, in order.
+            counts (array): the number of events on each day.
+            name (str): file name without extension.
+            title (str, optional): title of the chart.
+            ylabel (str, optional): label of the y axis.
+
+        Returns:
+            list of str: paths of the written files.
+        """
+        import numpy as np
+
+        marker = "o"
+        if len(days) and (days[-1] - days[0]).astype(int) >= self.max_points:
+            # sum the counts into bins of several days
+            width = -(-((days[-1] - days[0]).astype(int) + 1)
+                      // self.max_points)
+            bins = (days - days[0]).astype(np.int64) // width
+            counts = np.bincount(bins, weights=counts)
+            days = days[0] + np.arange(len(counts)) * width
+            days, counts = days[counts > 0], counts[counts > 0]
+            ylabel = f"{ylabel} per {width} Days"
+            marker = None
+
+        axes = self.axes("timeline", (12, 6))
+        axes.plot(days, counts, marker=marker, markersize=3, color="orange")
+        axes.set_xlabel("Date")
+        axes.set_ylabel(ylabel)
+        axes.set_title(title)
+        axes.tick_params(axis="x", labelrotation=45)
+        return self.save(axes, name)
+
 
 class SystemEventsManager:
     """A class for analyzing a txt log file containing a list of system events
@@ -13,9 +3759,333 @@ class SystemEventsManager:
                 system events information for. 
             path (str): name of the file that will be read to get the
                 system events information for.
+            streaming (bool): if True, analyses stream the file in chunks
+                and keep running totals instead of loading every event into
+                memory.
+            chunk_size (int): number of bytes read at a time when streaming.
+            csv_engine (str): where the vectorized counts of summary() and
+                activity() come from: "store" counts the columns of the
+                parsed events (see load_events()), which are read from the
+                cache when there is one; a pandas engine ("c" or "pyarrow")
+                parses the file into a DataFrame; "mmap" counts directly on
+                the memory-mapped bytes (see MappedEventLog).
+            workers (int): number of processes used by summary(),
+                activity(), extract_date_time() and id_warning_patterns();
+                above 1, the file is split into line-aligned byte ranges
+                that are analyzed in parallel.
+            cache (str or None): how the binary cache of the parsed events
+                ("<file>.cache") is checked against the file, "stat" or
+                "hash" (see load_event_store()); None parses the file
+                without a cache.
+            instrumentation (Instrumentation or None): if set, the calls of
+                the analysis methods are measured and reported to its
+                sinks.
+            rollups (bool): if True, the event type, month, day and time
+                frame counts are read from the rollups of the log (see
+                RollupIndex), which are kept up to date as events are
+                added, instead of from the log itself.
+            storage (str): where the events are kept, "text" (the log
+                file) or the name of a backend in STORAGE_BACKENDS, e.g.
+                "sqlite" (a database imported with import_log()). With a
+                backend, summary(), search_events(), activity(),
+                add_events() and manage_system_events() query and update
+                the database at the given path.
         """
-    
-    def manage_system_events(self, file_path, change_log_file=None):
+
+    def __init__(self, streaming=False, chunk_size=1 << 20,
+                 csv_engine="store", workers=1, cache="stat",
+                 instrumentation=None, rollups=False, storage="text"):
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        self.csv_engine = csv_engine
+        self.workers = workers
+        self.cache = cache
+        self.instrumentation = instrumentation
+        self.rollups = rollups
+        if storage != "text" and storage not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage \"{storage}\". Choose from "
+                             f"{['text'] + list(STORAGE_BACKENDS)}")
+        self.storage = storage
+        # absolute path -> open storage backend
+        self._backends = {}
+        # absolute path -> ((size, modification time), EventStore)
+        self._stores = {}
+        # absolute path -> ((size, modification time), DataFrame)
+        self._frames = {}
+        # (index class, absolute path) -> InvertedIndex or TimeIndex
+        self._indexes = {}
+
+    @instrumented
+    def load_events(self, path):
+        """Returns the parsed events of a log file. The file is only parsed
+        again if its size or modification time changed since the last call,
+        so every analysis run on the same file shares one parse, and with a
+        cache only the events appended since the cache was written are
+        parsed.
+
+        Args:
+            path (str): path to the system events file.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Returns:
+            EventStore: the parsed events.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        version = (stat.st_size, stat.st_mtime_ns)
+
+        cached = self._stores.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        if self.cache is None:
+            store = EventStore.from_file(path)
+        else:
+            store = load_event_store(path, self.cache)
+        self._stores[path] = (version, store)
+        return store
+
+    @instrumented
+    def load_frame(self, path):
+        """Returns the timestamps and categories of a log file as a typed
+        DataFrame (see read_event_frame()), reading the file again only if
+        its size or modification time changed.
+
+        Args:
+            path (str): path to the system events file.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Returns:
+            DataFrame: the timestamp and category of every event.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        version = (stat.st_size, stat.st_mtime_ns)
+
+        cached = self._frames.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        frame = read_event_frame(path, self.csv_engine)
+        self._frames[path] = (version, frame)
+        return frame
+
+    @instrumented
+    def load_index(self, path, index_class=InvertedIndex):
+        """Returns an index of a log file, loading the saved index the first
+        time and indexing only newly appended events afterwards.
+
+        Args:
+            path (str): path to the system events file.
+            index_class (class, optional): InvertedIndex (keywords) or
+                TimeIndex (timestamps). Default is InvertedIndex.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Returns:
+            LogIndex: the up to date index.
+        """
+        key = (index_class, os.path.abspath(path))
+        index = self._indexes.get(key)
+        if index is None:
+            index, changed = index_class.load(key[1])
+            self._indexes[key] = index
+        else:
+            changed = index.refresh()
+        # an unchanged index is not written again
+        if changed:
+            self._save_index(index)
+        return index
+
+    def _save_index(self, index):
+        """Saves an index next to its log. If it cannot be written (e.g. the
+        log is in a read-only directory), the manager only keeps it in
+        memory."""
+        try:
+            index.save()
+        except OSError:
+            pass
+
+    def backend(self, path):
+        """Returns the open storage backend of a log (see storage), opening
+        it the first time.
+
+        Args:
+            path (str): path to the database of the log.
+
+        Raises:
+            FileNotFoundError: If the database is not found.
+
+        Returns:
+            SQLiteEventLog: the backend of the log.
+        """
+        path = os.path.abspath(path)
+        backend = self._backends.get(path)
+        if backend is None:
+            backend = STORAGE_BACKENDS[self.storage](path)
+            self._backends[path] = backend
+        return backend
+
+    def _refresh_indexes(self, path):
+        """Indexes newly appended events in every index already loaded for
+        a log file (and in its rollups when they are used), and in its
+        parsed events and their cache."""
+        path = os.path.abspath(path)
+        for (index_class, index_path), index in self._indexes.items():
+            if index_path == path and index.refresh():
+                self._save_index(index)
+        if self.rollups:
+            self.load_rollups(path)
+        if path in self._stores:
+            self.load_events(path)
+
+    @instrumented
+    def build_rollups(self, paths):
+        """Builds the rollups of log files in bulk from their parsed events
+        (see RollupIndex.from_store()) and saves them, replacing any saved
+        rollups.
+
+        Args:
+            paths (list of str): paths to the system events files.
+
+        Raises:
+            FileNotFoundError: If a file is not found.
+
+        Returns:
+            dict: path of each log file -> number of (day, hour, category)
+                counts in its rollups.
+        """
+        sizes = {}
+        for path in paths:
+            index = RollupIndex.from_store(os.path.abspath(path),
+                                           self.load_events(path))
+            index.save()
+            self._indexes[(RollupIndex, index.path)] = index
+            sizes[path] = len(index.counts)
+        return sizes
+
+    def load_rollups(self, path):
+        """Returns the up to date rollups of a log file. Rollups that were
+        never saved are built in bulk first.
+
+        Args:
+            path (str): path to the system events file.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Returns:
+            RollupIndex: the rollups of the file.
+        """
+        if ((RollupIndex, os.path.abspath(path)) not in self._indexes
+                and not os.path.exists(RollupIndex.index_path(path))):
+            self.build_rollups([path])
+        return self.load_index(path, RollupIndex)
+
+    @instrumented
+    def import_log(self, path, database_path, change_log_file=None,
+                   storage="sqlite"):
+        """Imports a log file, and optionally its change log, into a new
+        database of a storage backend in one pass (see
+        SQLiteEventLog.import_log()). The log is parsed like every other
+        analysis (see load_events()).
+
+        Args:
+            path (str): path to the system events file.
+            database_path (str): path to the database; it is created if
+                it does not exist and must not have events yet.
+            change_log_file (str, optional): path to the change log of the
+                log. Default is None (no change log entries).
+            storage (str, optional): name of the backend in
+                STORAGE_BACKENDS. Default is "sqlite".
+
+        Raises:
+            FileNotFoundError: If the log or the change log is not found.
+            ValueError: If the database already has events.
+
+        Returns:
+            int: number of imported events.
+        """
+        store = self.load_events(path)
+        with STORAGE_BACKENDS[storage](database_path, create=True) as backend:
+            return backend.import_log(store, change_log_file)
+
+    @instrumented
+    def aggregate_events(self, path, pattern_length=3):
+        """Streams a log file once and keeps running totals of it (event
+        type counts, month/day/hour histograms and warning patterns) in
+        constant memory. With more than one worker, parts of the file are
+        read by separate processes and their totals merged.
+
+        Args:
+            path (str): path to the system events file.
+            pattern_length (int, optional): number of warning events that
+                form a pattern. Default is 3.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Returns:
+            EventAggregator: the totals for the whole file.
+        """
+        if self.workers > 1:
+            aggregator = parallel_aggregate(path, self.workers,
+                                            pattern_length, self.chunk_size)
+            # the workers' reads are not seen by this process
+            _count("bytes_read", os.path.getsize(path))
+            _count("lines_parsed", aggregator.events)
+            return aggregator
+
+        aggregator = EventAggregator(pattern_length)
+        for fields in iter_events(path, self.chunk_size):
+            aggregator.update(*fields)
+        return aggregator
+
+    async def follow(self, file_path, monitor, on_alert, poll_interval=0.5,
+                     from_end=False):
+        """Watches a log file as events are appended to it, keeping the
+        summary, activity and warning pattern counts of a monitor up to date
+        and reporting its alerts. Runs until it is cancelled.
+
+        Args:
+            file_path (str): path to the system events file.
+            monitor (WarningAlertMonitor): the live totals to update.
+            on_alert (callable): called with every alert of the monitor.
+            poll_interval (float, optional): seconds between two checks of
+                the file. Default is 0.5.
+            from_end (bool, optional): if True, only events appended from
+                now on are counted; otherwise the events already in the
+                file are counted first. Default is False.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+        """
+        start = 0
+        if from_end:
+            # start after the last complete line
+            size = os.path.getsize(file_path)
+            with open(file_path, "rb") as file:
+                file.seek(max(size - 4096, 0))
+                tail = file.read()
+            newline = tail.rfind(b"\n")
+            if newline >= 0:
+                start = size - len(tail) + newline + 1
+
+        async for batch in follow_events(file_path, start, poll_interval,
+                                         self.chunk_size):
+            for fields in batch:
+                alert = monitor.update(fields)
+                if alert is not None:
+                    on_alert(alert)
+
+    @instrumented
+    def manage_system_events(self, file_path, change_log_file=None,
+                             use_sidecar=False):
         """Manages system events through a series of nested functions that allow
         users to add events, and records the changes in a log.
             Primary author of function: Shemar Anglin
@@ -25,92 +4095,33 @@ class SystemEventsManager:
             file_path (str): the path to the file where system events are logged
             change_log_file (str, optional): The path to the file where changes 
                 are recorded. Default is None.
-        Nested Functions:
+            use_sidecar (bool, optional): if True, the last event ID and the
+                offset of its line are remembered in a "<file_path>.last.json"
+                sidecar so the next ID is found without reading the log.
+                Default is False.
+        Helper Functions (module level, shared with add_events):
             get_last_event_information: Retrieves the details of the last event
                 from the events txt file.
             format_given_date_and_time: changes date and time into a standard
-                format.
-            change_log_record: records the changes that are made and is saved in 
-                a separate file.
-            add_system_event: Handles user input to ad system events and up date
-                the change log.
-
-        Side Effects:
-            Continuous loop to prompt the user to enter the requested 
-                information.
-            Reads the given txt file and writes to the given txt files when
-                neccessary.
-        """
-        
-        event_categories = {
-            "Error":["Represents errors that occur on the system.",
-                    "EX: Appllication \"XYX\" failed to start"],
-            "Warning":["Indicates warning conditions.",
-                    "EX: Temperature warning: CPU overheating."],
-            "Update":["Represents instances of updates made on the system.",
-                    "EX: Driver update for graphics card completed"],
-            "Security":["Security events that occured on the system",
-                        "EX: Unauthorized login attempt"]
-        }
-        
-        def get_last_event_information():
-            """Retrieves the last date, time, and ID of the last event.
-                    Primary author of function: Shemar Anglin
-                    Technique: With statements
-
-            Raises:
-                FileNotFoundError: If teh specified file is not found.
-
-            Returns:
-                Opens and reads the event file to extract information.
-            """
-            
-            try:
-                with open(file_path, 'r') as file:
-                    lines = file.readlines()
-                    
-                    final_entry = lines[-1].strip().split(" | ")
-                    final_date_time = final_entry[0]
-                    final_id_of_final_line = final_entry[2]
-                    
-                    return final_date_time, final_id_of_final_line
-            except FileNotFoundError:
-                raise FileNotFoundError(
-                    f"File \"{file_path}\" not found. Try again."
-                )
-                
-        def format_given_date_and_time(date, time):
-            """Formats the provided date and time into a standard 
-                'YYYY-MM-DD HH:MM:00' format.
-                    Primary author of function: Shemar Anglin
-                    Technique: N/A
-                    
-            Args:
-                date (str): The date that is in MMDDYYYY format.
-                time (str): The time that is in HHMM format.
+                format.
+        Nested Functions:
+            change_log_record: records the changes that are made and is saved in 
+                a separate file.
+            add_system_event: Handles user input to ad system events and up date
+                the change log.
 
-            Raises:
-                ValueError: If the date or time is invalid and/or not in the
-                    expected ranges.
+        Side Effects:
+            Continuous loop to prompt the user to enter the requested 
+                information.
+            Reads the given txt file and writes to the given txt files when
+                neccessary.
+        """
+        
+        event_categories = EVENT_CATEGORIES
 
-            Returns:
-                str: The formatted date and time as one simple string.
-            """
-            
-            if len(date) != 8 or len(time) != 4:
-                raise ValueError("INVALID DATE AND/OR TIME FORMAT!\n")
-            else:
-                month, day, year = date[:2], date[2:4], date[4:]
-                hour, minute = time[:2], time[2:]
+        # the session's ChangeLogWriter, opened by the first change_log_record
+        change_log = []
 
-                if not (0 <= int(hour) < 24 and 0 <= int(minute) < 60):
-                    raise ValueError(
-                        "INVALID TIME! Hour must be 00-23, minute 00-59.\n"
-                    )
-                formatted_date = f"{year}-{month}-{day}"
-                formatted_time = f"{hour}:{minute}:00"
-                return formatted_date + " " + formatted_time
-            
         def change_log_record(
             user_name, change_type, priority_level, description
         ):
@@ -127,29 +4138,21 @@ class SystemEventsManager:
                 
             Side Effects:
                 Appends a new entry to the  change log file and/or creates that
-                    file if it does not exist.
+                    file if it does not exist. The file is opened on the first
+                    change of the session and kept open until the session
+                    ends.
             """
             
             change_log_file_path = (
-                "default_system_made_change_log.txt" if change_log_file is None 
+                DEFAULT_CHANGE_LOG_FILE if change_log_file is None 
                 else change_log_file
             )
             
-            try:
-                with open(change_log_file_path, 'r') as log_file:
-                    lines = log_file.readlines()
-                    log_number = len(lines) + 1
-            except FileNotFoundError:
-                with open(change_log_file_path, 'w') as log_file:
-                    pass
-                log_number = 1
-                
-            with open(change_log_file_path, 'a') as log_file:
-                new_entry = (
-                    f"{log_number}. | {user_name} | {change_type} | "
-                    f"{priority_level} | {description}\n"
-                )
-                log_file.write(new_entry)
+            if not change_log:
+                change_log.append(ChangeLogWriter(change_log_file_path))
+            change_log[0].record(
+                user_name, change_type, priority_level, description
+            )
         
         def add_system_event():
             """Prompts the user to add a new system event, calls on the other
@@ -205,17 +4208,19 @@ class SystemEventsManager:
                 ).strip()
                 user_name = input("Enter your name (for records): \n").strip()
                 
-                _, last_id = get_last_event_information()
-                next_event_id_number = int(last_id[2:]) + 1
-                next_event_id = f"ID{next_event_id_number}"
-                
-                new_event = (
-                    f"{formatted_date_and_time} | {event_type} | "
-                    f"{next_event_id} | {event_description}"
-                )
-                
-                with open(file_path, 'a') as file:
-                    file.write("\n" + new_event)
+                event = (formatted_date_and_time, event_type, priority,
+                         event_description, user_name)
+                if self.storage != "text":
+                    # the database records the change log entry in the
+                    # same transaction
+                    self.backend(file_path).append_events([event])
+                    print("SUCCESS! The event has been added\n")
+                    return
+
+                # the next ID is taken and the event written under a lock
+                # on the file, so concurrent writers get different IDs
+                append_events(file_path, [event], use_sidecar)
+                self._refresh_indexes(file_path)
                 print("SUCCESS! The event has been added\n")
                 
                 change_log_record(
@@ -228,28 +4233,323 @@ class SystemEventsManager:
             except Exception as e:
                 print(f"An unexpected error has occured: {e}")
         
-        while True:
-            try:
-                print(
-                    "Choose an option:\n1. Add an event of your own\n2. Exit\n"
-                )
+        try:
+            while True:
+                try:
+                    print(
+                        "Choose an option:\n1. Add an event of your own\n"
+                        "2. Exit\n"
+                    )
 
-                choice = input("Enter your choice (1/2): ").strip()
+                    choice = input("Enter your choice (1/2): ").strip()
                 
-                if choice not in ["1", "2"]:
-                    raise ValueError(
-                        "Invalid choice! Please enter '1' or '2'.\n"
-                    )
+                    if choice not in ["1", "2"]:
+                        raise ValueError(
+                            "Invalid choice! Please enter '1' or '2'.\n"
+                        )
 
-                if choice == '1':
-                    add_system_event()
-                elif choice == '2':
-                    print("Exiting the program. Goodbye!")
-                    break
-            except ValueError as e:
-                print(e)
-            
+                    if choice == '1':
+                        add_system_event()
+                    elif choice == '2':
+                        print("Exiting the program. Goodbye!")
+                        break
+                except ValueError as e:
+                    print(e)
+        finally:
+            if change_log:
+                change_log[0].close()
+
+    @instrumented
+    def add_events(self, file_path, events, change_log_file=None,
+                   use_sidecar=False, sync=False):
+        """Adds many events at once without prompting, e.g. for events sent
+        by monitoring agents. Every event is validated first, then all of
+        them get consecutive IDs and are written with a single locked write
+        (see append_events()), and their change log entries are written as
+        one batch. For a stream of events from many producers, see
+        GroupCommitAppender. With a storage backend, the events and their
+        change log entries are added to the database in one transaction.
+
+        Args:
+            file_path (str): the path to the file where system events are
+                logged.
+            events (iterable of dict): the events to add. Each one needs the
+                keys "date" (MMDDYYYY), "time" (HHMM), "category" (one of
+                EVENT_CATEGORIES), "priority" ("High" or "Low"),
+                "description" and "user_name".
+            change_log_file (str, optional): The path to the file where
+                changes are recorded. Default is None.
+            use_sidecar (bool, optional): if True, read and update the
+                "<file_path>.last.json" sidecar (see manage_system_events()).
+                Default is False.
+            sync (bool, optional): if True, the events are flushed to disk
+                (fsync) before returning. Default is False.
+
+        Raises:
+            FileNotFoundError: If the events file is not found.
+            ValueError: If any event is invalid. Nothing is written in that
+                case.
+
+        Returns:
+            list of str: the IDs given to the new events, in order.
+        """
+        validated = [validate_event(event, number)
+                     for number, event in enumerate(events, start=1)]
+        if not validated:
+            return []
+        if self.storage != "text":
+            return self.backend(file_path).append_events(validated)
+
+        new_ids = append_events(file_path, validated, use_sidecar, sync)
+        self._refresh_indexes(file_path)
+
+        change_log_file_path = (
+            DEFAULT_CHANGE_LOG_FILE if change_log_file is None
+            else change_log_file
+        )
+        with ChangeLogWriter(change_log_file_path) as change_log:
+            change_log.record_many(
+                (user_name, "Add Event", priority,
+                 f"Added '{event_type}' Event")
+                for _, event_type, priority, _, user_name in validated
+            )
+
+        return new_ids
+
+    @instrumented
+    def event_type_counts(self, path, events):
+        """Counts the events of each type, once per event by its category
+        field. Used by summary().
+
+        Args:
+            path (str): path to the system events file.
+            events (list of str): the event types to count.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Returns:
+            dict: event type -> number of events, in the order of events.
+        """
+        if self.storage != "text":
+            category_counts = self.backend(path).category_counts()
+            return {event: category_counts.get(event, 0) for event in events}
+        if self.rollups:
+            category_counts = self.load_rollups(path).category_counts()
+            return {event: category_counts.get(event, 0) for event in events}
+        if self.streaming or self.workers > 1:
+            return count_event_types(
+                self.aggregate_events(path).pair_counts, events
+            )
+        if self.csv_engine == "store":
+            category_counts = self.load_events(path).category_counts()
+            return {event: category_counts.get(event, 0) for event in events}
+        if self.csv_engine == "mmap":
+            with MappedEventLog(path) as log:
+                category_counts = log.count_field(1)
+            return {event: category_counts.get(event, 0) for event in events}
+
+        category_counts = event_histograms(self.load_frame(path))["category"]
+        return {event: int(category_counts.get(event, 0)) for event in events}
+
+    @instrumented
+    def review_events(self, path, event_type):
+        """Yields the lines of every event of one type (the "Review" option
+        of summary()).
+
+        Args:
+            path (str): path to the system events file.
+            event_type (str): category of the events, e.g. "Warning".
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Yields:
+            str: the event lines, in file order.
+        """
+        if self.storage != "text":
+            yield from self.backend(path).lines(event_type)
+            return
+        if self.streaming:
+            # streaming mode reads the lines again instead of keeping them
+            for fields in iter_events(path, self.chunk_size):
+                if fields[1] == event_type:
+                    yield FIELD_SEPARATOR.join(fields)
+            return
+
+        index = self.load_index(path)
+        yield from index.lines(index.query([], category=event_type))
+
+    @instrumented
+    def date_events(self, path, month, day):
+        """Yields the lines of every event on a day of the year in any year
+        (the "Time Frame" option of summary()).
+
+        Args:
+            path (str): path to the system events file.
+            month (int): month, 1-12.
+            day (int): day of the month, 1-31.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Yields:
+            str: the event lines, in file order.
+        """
+        if self.storage != "text":
+            yield from self.backend(path).month_day_lines(month, day)
+            return
+        if self.streaming:
+            for fields in iter_events(path, self.chunk_size):
+                if (int(fields[0][5:7]) == month
+                        and int(fields[0][8:10]) == day):
+                    yield FIELD_SEPARATOR.join(fields)
+            return
+
+        # the time index jumps straight to that day in every year
+        yield from self.load_index(path, TimeIndex).on_month_day(month, day)
+
+    @instrumented
+    def time_frame_counts(self, path, month, day):
+        """Counts the events of each type on a day of the year in any year
+        (the events listed by date_events()).
+
+        Args:
+            path (str): path to the system events file.
+            month (int): month, 1-12.
+            day (int): day of the month, 1-31.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Returns:
+            dict: event type -> number of events on that day.
+        """
+        if self.rollups:
+            return self.load_rollups(path).month_day_counts(month, day)
+        counts = {}
+        for line in self.date_events(path, month, day):
+            category = _split_event_line(line)[1]
+            counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    @instrumented
+    def month_counts(self, path):
+        """Counts the events of each month of the year (the data behind the
+        activity() histogram).
+
+        Args:
+            path (str): path to the system events file.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Returns:
+            dict: month (1-12) -> number of events, for the months that have
+                events, in month order.
+        """
+        if self.storage != "text":
+            month_counts = self.backend(path).month_counts()
+        elif self.rollups:
+            month_counts = self.load_rollups(path).month_counts()
+        elif self.streaming or self.workers > 1:
+            month_counts = self.aggregate_events(path).month_counts
+        elif self.csv_engine in ("store", "mmap"):
+            import numpy as np
+
+            if self.csv_engine == "store":
+                months = self.load_events(path).months()
+            else:
+                with MappedEventLog(path) as log:
+                    months = log.months()
+            months, counts = np.unique(months, return_counts=True)
+            month_counts = dict(zip(months, counts))
+        else:
+            month_counts = dict(self.load_frame(path)[
+                "timestamp"
+            ].dt.month.value_counts().items())
+        return {int(month): int(month_counts[month])
+                for month in sorted(month_counts)}
+
+    @instrumented
+    def daily_counts(self, path, event_type=None):
+        """Counts the events of each day, the data behind the timelines of
+        render_reports().
+
+        Args:
+            path (str): path to the system events file.
+            event_type (str, optional): only count the events of this type,
+                e.g. "Warning". Default is every event.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Returns:
+            tuple: the days with events (datetime64[D] array, in order) and
+                the number of events on each of them (int64 array).
+        """
+        import numpy as np
+
+        if self.rollups:
+            day_counts = self.load_rollups(path).day_counts(event_type)
+            return (np.array(list(day_counts), dtype=np.int64).astype(
+                        "datetime64[D]"
+                    ),
+                    np.array(list(day_counts.values()), dtype=np.int64))
+        if self.streaming:
+            day_counts = Counter(
+                fields[0][:10]
+                for fields in iter_events(path, self.chunk_size)
+                if event_type is None or fields[1] == event_type
+            )
+            days = sorted(day_counts)
+            return (np.array(days, dtype="datetime64[D]"),
+                    np.array([day_counts[day] for day in days],
+                             dtype=np.int64))
+
+        store = self.load_events(path)
+        timestamps = np.frombuffer(store.timestamps, dtype=np.int64)
+        if event_type is not None:
+            code = store.category_code(event_type)
+            codes = np.frombuffer(store.category_codes, dtype=np.uint16)
+            timestamps = (timestamps[:0] if code is None
+                          else timestamps[codes == code])
+        days, counts = np.unique(timestamps // SECONDS_PER_DAY,
+                                 return_counts=True)
+        return days.astype("datetime64[D]"), counts
+
+    @instrumented
+    def search_events(self, file_path, event_type, keyword):
+        """Yields the events of a type whose description contains a keyword,
+        ignoring case (the search behind keyword_search()).
+
+        Args:
+            file_path (str): path to the system events file.
+            event_type (str): text the category has to contain, e.g.
+                "Error".
+            keyword (str): text the description has to contain.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+
+        Yields:
+            str: the matching event lines, in file order.
+        """
+        if self.storage != "text":
+            yield from self.backend(file_path).search(keyword, event_type)
+            return
+        if self.streaming:
+            for fields in iter_events(file_path, self.chunk_size):
+                if (event_type.lower() in fields[1].lower()
+                        and keyword.lower() in fields[3].lower()):
+                    yield FIELD_SEPARATOR.join(fields)
+            return
 
+        # the saved index is updated with any new events and narrows the
+        # search down to the lines that can match
+        yield from self.load_index(file_path).find(keyword, event_type)
+
+    @instrumented
     def summary (self, path):
         """ Displays a dictionary of the number of events then the user chooses 
         a review of an event type or a specific date to display events.
@@ -261,17 +4561,10 @@ class SystemEventsManager:
                 Primary author of function: Cam Gordon
                 Technique: Comprehensions
         """
-        events = ["Update", "Files", "Error", "Warning", "Security"]
-        general_summ = {event: 0 for event in events}
+        events = SUMMARY_EVENTS
+        general_summ = self.event_type_counts(path, events)
         options = ["Review", "Time Frame"]
 
-        with open(path, "r", encoding = "utf-8") as file:
-            log_lines = [line.strip() for line in file]
-            for line in log_lines:
-                for event in events:
-                    if event in line:
-                        general_summ[event] += 1
-
         for event, num in general_summ.items():
             print(f"{event}: {num}")
     
@@ -282,16 +4575,15 @@ class SystemEventsManager:
             return
 
         if q1 == options[0]:
-            q2 = input("Enter an event-type (Update, Files, Error, Warning, Security): ")
+            q2 = input(f"Enter an event-type ({', '.join(events)}): ")
 
             if q2 not in events:
                 print("Not an event type")
                 return
 
             print(f"\nResults for {q1} - {q2}")
-            for line in log_lines:
-                if q2 in line:
-                    print(line)
+            for line in self.review_events(path, q2):
+                print(line)
 
         if q1 == options[1]:
             m = [i for i in range(1,13)]
@@ -310,18 +4602,13 @@ class SystemEventsManager:
                 return
 
             print(f"\nEvents from this date: {q3_int}-{q4_int}")
-            for line in log_lines:
-                date = line.split(" ")[0]
-                month = date.split("-")[1]
-                month_int = int(month)
-                day = date.split("-")[2]
-                day_int = int(day)
-                if month_int == q3_int and day_int == q4_int:
-                    print(line)
+            for line in self.date_events(path, q3_int, q4_int):
+                print(line)
                 
   
              
-    def activity(self, path, histogram=True):
+    @instrumented
+    def activity(self, path, histogram=True, renderer=None):
         """ Displays a histogram showing each month's activity or optionally
         shows the data frame.
             Primary author of function: Cam Gordon
@@ -331,18 +4618,49 @@ class SystemEventsManager:
             path(string): A path to the file.
             histogram (boolean): optional data frame that shows which month
             is assigned to each row.
+            renderer (ReportRenderer, optional): if given, the monthly
+            counts are drawn to image files by the renderer instead of
+            being shown, e.g. on a server without a display.
             
         Returns:
-            A histogram or data frame
+            A histogram or data frame. In streaming, parallel or rollups mode,
+            or with a storage backend, the data frame has one row per month
+            (month_count) with the number of events in it (events) instead
+            of one row per event. With a renderer, the paths of the written
+            files.
         """
-        month_count = []
-        with open(path, "r", encoding = "utf-8") as file:
-            for events in file:
-                line = events.split(" | ")
-                date_time = line[0].split(" ")[0]
-                month = int(date_time.split("-")[1])
-                month_count.append(month)
-        month_dict = {"month_count": month_count}
+        if renderer is not None:
+            name = os.path.splitext(os.path.basename(path))[0]
+            return renderer.month_chart(self.month_counts(path),
+                                        f"{name}-activity")
+
+        import matplotlib.pyplot as plt
+        import pandas as pd
+
+        if (self.streaming or self.workers > 1 or self.rollups
+                or self.storage != "text"):
+            month_counts = self.month_counts(path)
+            months = sorted(month_counts)
+            counts = [month_counts[month] for month in months]
+
+            if histogram:
+                # same bins as df.hist(), weighted by the monthly totals
+                fig, ax = plt.subplots()
+                ax.hist(months, weights=counts)
+                ax.set_title("month_count")
+                ax.grid(True)
+                plt.show()
+                return
+            return pd.DataFrame({"month_count": months, "events": counts})
+
+        if self.csv_engine == "store":
+            month_dict = {"month_count": self.load_events(path).months()}
+        elif self.csv_engine == "mmap":
+            with MappedEventLog(path) as log:
+                month_dict = {"month_count": log.months()}
+        else:
+            month_count = self.load_frame(path)["timestamp"].dt.month
+            month_dict = {"month_count": month_count.to_numpy()}
         df = pd.DataFrame(month_dict)
 
         if histogram:
@@ -352,7 +4670,8 @@ class SystemEventsManager:
             return df
     
     
-    def extract_date_time(self, file_path):
+    @instrumented
+    def extract_date_time(self, file_path, quiet=False, as_array=False):
         """
         Extracts the date and time from each event entry in a system event file
             Primary author of function: Neha Islam
@@ -360,10 +4679,17 @@ class SystemEventsManager:
             
         Args: 
             file_path(str): The path to the system event file
+            quiet (bool, optional): if True, nothing is printed; printing
+                takes far longer than the extraction on large files.
+                Default is False.
+            as_array (bool, optional): if True, the timestamps are returned
+                as a NumPy datetime64[s] array instead of string tuples.
+                Default is False.
         
         Returns:
             list of tuples: A list where each element is a tuple that contains
-                the date and time of a system event
+                the date and time of a system event. With as_array, a
+                datetime64[s] array of the timestamps.
         
         Raises:
             FileNotFoundError: If the file cannot be found.
@@ -375,31 +4701,69 @@ class SystemEventsManager:
                 "Extracted Dates and Times:" outputs a list of (Date, Time) 
                 tuples
         """
-        regex = r'(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})'
         extracted_dates_times = []
 
         try:
-            with open(file_path, 'r', encoding="utf-8") as f: 
-                for line in f:
-                    matches = re.findall(regex, line)
-                    if matches:
-                        for match in matches:
-                            date_time = match.split()
-                            date = date_time[0]
-                            time = date_time[1]
-                            extracted_dates_times.append((date, time))
+            if as_array:
+                extracted_dates_times = self._timestamp_array(file_path)
+            elif self.workers > 1:
+                extracted_dates_times = parallel_date_times(
+                    file_path, self.workers, self.chunk_size
+                )
+            elif self.streaming:
+                # one compiled pattern searches whole chunks of the file
+                extracted_dates_times = list(
+                    iter_date_times(file_path, self.chunk_size)
+                )
+            else:
+                import numpy as np
+
+                # the timestamps are formatted all at once by NumPy, as
+                # 'YYYY-MM-DDTHH:MM:SS'
+                store = self.load_events(file_path)
+                extracted_dates_times = [
+                    (date_time[:10], date_time[11:]) for date_time in
+                    np.datetime_as_string(
+                        store.timestamps_datetime64()
+                    ).tolist()
+                ]
         except FileNotFoundError:
             raise FileNotFoundError("The file is not found.")
         except Exception:
             raise Exception("There is an error.")
-    
-        print("Extracted Dates and Times:")
-        for date, time in extracted_dates_times:
-            print(f"(Date: {date}, Time: {time})")
+
+        if quiet:
+            return extracted_dates_times
+
+        if as_array:
+            import numpy as np
+
+            pairs = ((date_time[:10], date_time[11:]) for date_time in
+                     np.datetime_as_string(extracted_dates_times).tolist())
+        else:
+            pairs = extracted_dates_times
+        # one write instead of a print() per event
+        sys.stdout.write("Extracted Dates and Times:\n" + "".join(
+            f"(Date: {date}, Time: {time})\n" for date, time in pairs
+        ))
     
         return extracted_dates_times
 
+    def _timestamp_array(self, file_path):
+        """Returns the timestamps of extract_date_time(as_array=True)."""
+        if self.workers > 1:
+            return parallel_timestamps(file_path, self.workers,
+                                       self.chunk_size)
+        if self.streaming:
+            return extract_timestamps(file_path, self.chunk_size)
+        if self.csv_engine == "mmap":
+            with MappedEventLog(file_path) as log:
+                return log.timestamps()
+        # a copy, since the store's array cannot grow while it is shared
+        return self.load_events(file_path).timestamps_datetime64().copy()
+
     
+    @instrumented
     def keyword_search(self, file_path):
         """
         Allows users to search for and view specific event types from 
@@ -465,36 +4829,20 @@ class SystemEventsManager:
                 if keyword not in keyword_history:
                     keyword_history.append(keyword)
 
-                with open(file_path, 'r') as file:
-                    event_found = False
-                    print("\nSearch Results:")
-
-                    for line in file:
-                        parts = line.split('|')
-                        
-                        if (
-                            len(parts) > 3 
-                            and event_type.lower() in parts[1].strip().lower()
-                        ):
-                            # extract the event details
-                            date_time = parts[0].strip()  
-                            event = parts[1].strip()  
-                            event_id = parts[2].strip() 
-                            description = parts[3].strip()  
-                            
-                            if keyword.lower() not in description.lower():
-                                continue
-                            event_details = (
-    f"{date_time} | {event} | {event_id} | {description}"
-)
-                            # print the matching event
-                            print(f"\n{event_details}")
-                            event_found = True
-                            
-                            # add the event to the event history
-                            if event_details not in event_history:
-                                event_history.append(event_details)
-                    print(
+                event_found = False
+                print("\nSearch Results:")
+
+                for event_details in self.search_events(
+                    file_path, event_type, keyword
+                ):
+                    # print the matching event
+                    print(f"\n{event_details}")
+                    event_found = True
+                    
+                    # add the event to the event history
+                    if event_details not in event_history:
+                        event_history.append(event_details)
+                print(
     "\nNo events found matching." if not event_found else ""
 )
 
@@ -534,6 +4882,7 @@ class SystemEventsManager:
                 break  
                             
                             
+    @instrumented
     def id_warning_patterns(self, file_path, pattern_length=3):
         """  
         Identifies patterns of warning events in the log file.
@@ -543,67 +4892,67 @@ class SystemEventsManager:
             file_path (str): Path to the file.
             pattern_length (int): Number of warning events to form a pattern. Default is 3.
         Returns:
-            dict: Patterns with occurrences greater than 1.
+            dict: Patterns with occurrences greater than 1. A pattern is
+                counted once for every warning that completes it.
         """
 
-        warning_patterns = {} # Dictionary to store patterns and their counts
-
-        with open(file_path, 'r') as file:
-            logs = file.readlines()
-
-        event_sequence = []
-
-        for line in logs:
-            parts = [part.strip() for part in line.split('|')]
-            if len(parts) < 4:
-                continue
-
-            event_type = parts[1]
-            event_desc = parts[3]
-
-            # Append to sequence if it's a "Warning" event
-            if event_type == "Warning":
-                event_sequence.append((event_type, event_desc))
-
-            # Only check for patterns if we have enough warning patterns to account for.
-            if len(event_sequence) >= pattern_length:
+        if self.streaming or self.workers > 1:
+            patterns = self.aggregate_events(
+                file_path, pattern_length
+            ).warning_patterns
+            return {pattern: count for pattern, count in patterns.items()
+                    if count > 1}
 
-             # Create a pattern from the last 'pattern_length' warning events
-             pattern = tuple(event_sequence[-pattern_length:])
-
-             # Increase the count of pattern, initilizing if necessary 
-             warning_patterns[pattern] = warning_patterns.get(pattern, 0) + 1
+        # the counts are kept in a saved index that only reads the events
+        # appended since the last call
+        index = self.load_index(file_path, WarningPatternIndex)
+        new_length = pattern_length not in index.counts
+        warning_patterns = index.patterns(pattern_length)
+        if new_length:
+            self._save_index(index)
 
         # Use comprehension to filter patterns occurring more than once
         significant_patterns = {pattern: count for pattern, count in warning_patterns.items() if count > 1}
         return significant_patterns
 
-    log_file_path = "spring2024_system_events.txt"
-    pattern_length = 3
-
-    # Call function with parsed arguments 
-    patterns = id_warning_patterns(log_file_path, pattern_length=pattern_length)
-
-    # Display patterns using sequence unpacking and f-strings
-    for i, (pattern, count) in enumerate(patterns.items(), start=1):
-        events = " -> ".join(f"{event[1]}" for event in pattern) 
-        print(f"{i}. Pattern: {events} | Occurrences: {count}")
-
-
-
-    def visualize_warning_patterns(self, patterns, timestamps):
+    def visualize_warning_patterns(self, patterns, timestamps,
+                                   renderer=None, name="warnings"):
         """
         Visualizes warning patterns as a bar chart and warning trends over time as a timeline chart.
             Primary author of function: Stephany Alas-Jovel
             Technique: Data visualization - bar chart, timeline chart
         Parameters:
             patterns (dict): Dictionary of warning patterns and their occurrences.
-            timestamps (list): List of timestamps for all warning events.
+            timestamps (list): List of timestamps for all warning events,
+                as strings or a NumPy datetime64 array. They are counted per
+                day before plotting.
+            renderer (ReportRenderer, optional): if given, the charts are
+                written to image files by the renderer instead of being
+                shown, e.g. on a server without a display.
+            name (str, optional): start of the file names of the rendered
+                charts. Default is "warnings".
+        Returns:
+            list: the paths of the written files when a renderer is given.
          """
+        # Count warnings per day
+        days, counts = daily_totals(timestamps)
+
+        if renderer is not None:
+            paths = []
+            if patterns:
+                paths += renderer.pattern_chart(patterns, f"{name}-patterns")
+            if len(days):
+                paths += renderer.timeline_chart(days, counts,
+                                                 f"{name}-timeline")
+            return paths
+
+        import matplotlib.pyplot as plt
+
         # Visualization 1: Bar Chart for Most Frequent Warning Patterns
         if patterns:
             # Prepare data for bar chart
-            pattern_labels = [" -> ".join(event[1] for event in pattern) for pattern in patterns.keys()]
+            pattern_labels = [pattern_label(pattern)
+                              for pattern in patterns.keys()]
             pattern_counts = list(patterns.values())
 
             # Plot bar chart
@@ -616,51 +4965,109 @@ class SystemEventsManager:
             plt.show()
 
         # Visualization 2: Timeline Chart for Warning Trends
-        if timestamps:
-            # Ensure timestamps are strings and extract the date portion
-            dates = [ts[:10] for ts in timestamps]
+        if len(days):
+            # Plot timeline
+            plt.figure(figsize=(12, 6))
+            plt.plot(days, counts, marker='o', color='orange')
+            plt.xlabel("Date")
+            plt.ylabel("Number of Warnings")
+            plt.title("Warning Events Over Time")
+            plt.xticks(rotation=45)
+            plt.tight_layout()
+            plt.show()
 
-        # Count warnings per day
-        counts_by_date = {}
-        for date in dates:
-            counts_by_date[date] = counts_by_date.get(date, 0) + 1
-
-        # Prepare data for timeline
-        sorted_dates = list(sorted(counts_by_date.keys()))
-        counts = [counts_by_date[date] for date in sorted_dates]
-
-         # Plot timeline
-        plt.figure(figsize=(12, 6))
-        plt.plot(sorted_dates, counts, marker='o', color='orange')
-        plt.xlabel("Date")
-        plt.ylabel("Number of Warnings")
-        plt.title("Warning Events Over Time")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.show()
-
-    # Example main code
-    log_file_path = "spring2024_system_events.txt"
-    pattern_length = 3
-
-    # Ensure you define the `patterns` and `timestamps` dictionaries before running this function
-    patterns = id_warning_patterns(log_file_path, pattern_length=pattern_length)
-
-    timestamps = [
-        "2024-01-01 01:33:00",
-        "2024-01-01 07:54:00",
-        "2024-01-01 10:23:00",
-        "2024-01-02 11:02:00",
-        "2024-01-03 04:30:00",
-        "2024-01-03 08:53:00",
+    def warning_patterns_demo(self, file_path, pattern_length=3):
+        """Example of the warning pattern functions: finds the warning
+        patterns of a log file, prints them and visualizes them together
+        with the timestamps of the file's warning events. This used to run
+        while the class was being defined; it now only runs when called
+        (e.g. from option 8 of main_menu()).
+
+        Args:
+            file_path (str): Path to the file.
+            pattern_length (int): Number of warning events to form a
+                pattern. Default is 3.
+
+        Side effects:
+            Prints the patterns to the console and shows the two charts of
+            visualize_warning_patterns().
+        """
+        # Call function with parsed arguments 
+        patterns = self.id_warning_patterns(
+            file_path, pattern_length=pattern_length
+        )
+
+        # Display patterns using sequence unpacking and f-strings
+        for i, (pattern, count) in enumerate(patterns.items(), start=1):
+            events = " -> ".join(f"{event[1]}" for event in pattern) 
+            print(f"{i}. Pattern: {events} | Occurrences: {count}")
+
+        import numpy as np
+
+        # the warning timestamps stay in a datetime64 array that is counted
+        # per day instead of being formatted one by one
+        store = self.load_events(file_path)
+        codes = np.frombuffer(store.category_codes, dtype=np.uint16)
+        timestamps = store.timestamps_datetime64()[
+            codes == store.category_code("Warning")
         ]
 
-    # Visualize results
-    visualize_warning_patterns(patterns, timestamps)
+        # Visualize results
+        self.visualize_warning_patterns(patterns, timestamps)
+
+    def render_reports(self, paths, output_dir, formats=("png",),
+                       pattern_length=3, top=20):
+        """Writes the charts of several log files to image files without a
+        display, e.g. for a nightly dashboard. Every chart is drawn from
+        counts (per month, per day, per pattern) rather than from the
+        events, and one ReportRenderer reuses its figures for all files.
 
+        Args:
+            paths (list of str): paths to the system events files.
+            output_dir (str): directory the charts are written to.
+            formats (tuple of str, optional): image formats, "png" and/or
+                "svg". Default is PNG only.
+            pattern_length (int, optional): number of warning events in a
+                pattern. Default is 3.
+            top (int, optional): number of warning patterns drawn. Default
+                is 20.
+
+        Raises:
+            FileNotFoundError: If a file is not found.
 
+        Returns:
+            dict: path of each log file -> paths of its charts. For a file
+                "<name>.txt" they are "<name>-activity", "<name>-daily",
+                "<name>-warnings-patterns" (if any pattern repeats) and
+                "<name>-warnings-timeline" (if there are warnings).
+        """
+        renderer = ReportRenderer(output_dir, formats)
+        reports = {}
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            charts = self.activity(path, renderer=renderer)
+            days, counts = self.daily_counts(path)
+            if len(days):
+                charts += renderer.timeline_chart(
+                    days, counts, f"{name}-daily",
+                    title="Events per Day", ylabel="Number of Events"
+                )
+            patterns = self.id_warning_patterns(path, pattern_length)
+            if patterns:
+                charts += renderer.pattern_chart(
+                    patterns, f"{name}-warnings-patterns", top
+                )
+            days, counts = self.daily_counts(path, "Warning")
+            if len(days):
+                charts += renderer.timeline_chart(
+                    days, counts, f"{name}-warnings-timeline"
+                )
+            reports[path] = charts
+        return reports
 
-    def event_sequence(self, file_path):
+    @instrumented
+    def event_sequence(self, file_path, max_length=10, min_support=2,
+                       top_k=3, quiet=False):
         """A function to find the most common order of system events within the
             txt file.  
                 Primary author of function: Christie Cao
@@ -669,22 +5076,29 @@ class SystemEventsManager:
         Args: 
             file_path (str): name of the file that will be read to get the
                 system events information for. 
+            max_length (int, optional): longest sequence of events to look
+                for. Default is 10.
+            min_support (int, optional): minimum number of times a sequence
+                has to occur to be reported. Default is 2.
+            top_k (int, optional): how many of the most common sequences to
+                return, or None for all of them. Default is 3.
+            quiet (bool, optional): if True, the sequences are only returned,
+                not printed. Default is False.
             
         Returns:
-            The top three most common sequences of events as strings. 
-                Format (note: is along the lines of what looking to output,
-                    numbers/sequences below are not exact): 
+            list of tuples: the top_k most common sequences as
+                (sequence, number of occurrences) pairs, most common first.
+                The same sequences are printed to the console in the format
+                (note: numbers/sequences below are not exact): 
                         "Top 3 most common sequences:
                         (event1, event2, event3): 28
                         (event6, event3, event2): 16
                         (event1, event2): 15"
             
         Side effects: 
-            Adds/modifies the keys and values of "count" dictionary (mutable)
-                when seeing what sequences of events
-                have occurred.  
             Prints the most common event sequences to the console as tuples,
-                with the number of occurrences (str) displayed in the same line.
+                with the number of occurrences (str) displayed in the same line
+                (unless quiet is True).
 
         Attribution:
             The Python Software Foundation (2024) 4.3. The range() Function
@@ -702,139 +5116,38 @@ class SystemEventsManager:
                     for i in range(len(a))"
 
             My modifications:
-                "for len_of_sequence in range(2, len(entire_descriptions))"
-                and "for start_point in range(0, len(entire_descriptions)
-                    - len_of_sequence)" - combined both source code
-                        snippets to include searching within a range for both
-                        regular numeric values (2) and the length of a
-                        list (len(entire_descriptions)).
+                "for start_point in range(len(codes) - 1)" in mine_sequences()
+                    - combined both source code snippets to go through every
+                    start point of a sequence within the length of a list
+                    (len(codes)).
                 
             More information about why/how used source code in program in PDF
                 documentation for final submission.
             """
             
-        # will include all the event descriptions/entries within the file to be
-            # sorted afterwards
-        entire_descriptions = []
+        # the event descriptions are already parsed into the shared event
+            # store as small integer codes (one per distinct description), so
+            # the sequences are mined over the codes and turned back into
+            # descriptions afterwards
+        store = self.load_events(file_path)
 
-
-        with open(file_path, "r", encoding="utf-8") as f:
-            # capturing group that matches one or more characters from the end
-                # of line in the file that is not separator character (|) 
-            regex = r"([^|]+)$"
-            
-            for line in f:
-                matches = re.search(regex, line)
-            
-                # if matches the filtering criteria (meaning is the "event
-                    # description")
-                if matches:
-                    # gets entire match object and strips the whitespace, not
-                        # including the spaces between words (before stripping,
-                        # is exactly " System update completed" from regex)
-                    event_desc = matches.group(0).strip()
-                    entire_descriptions.append(event_desc)
-
-        # empty dictionary for now, but will be in following the format later:
-        # count = {
-            # sequence1: number of times sequence has occurred
-            # sequence2: number of times sequence has occurred
-            # etc.}
-        count = {}
-
-
-        # goes through all possible sequence lengths that can occur until have
-            # gone through all of the events in the file (range starts at 2
-            # since at least two events need to be listed to be considered a
-            # sequence)
-                # (in other words: one event is not a sequence since it's by
-                # itself)
-        for len_of_sequence in range(2, len(entire_descriptions)):
-            
-            
-            # now actually going through each event sequence to see what events
-                # different sequences can contain (like what events come after
-                # each other)
-            # starting at first event in list of event descriptions (index 0)
-                # and iterates until the last line/event (minus the length of 
-                # sequences we're trying to find) in order to prevent the
-                # indexes from going out of bounds
-                    # eg: if we have a list of 6 event_desc in
-                    # entire_descriptions,
-                        # entire_descriptions =
-                            # [event1, event2, event3, event4, event5, event6]
-                        # as the len_of_sequence = 2 and our start_point is 0,
-                            # we will look at two events in a row during loop
-                            # (event1 and event2), then (event2 and event3), etc.)
-                        # when len_of_sequence = 3 and our start_point is 0, 
-                            # will look at (event1, event2, event3), then
-                            # (event2, event3, event4), etc.
-                        
-                        # "(len(entire_descriptions) - len of sequence)"  
-                            # minusing len_of_sequence determines number of
-                            # iterations that will go through when indexing
-                            # through events
-                        # going back to example with 6 events in
-                            # entire_descriptions and inputting into
-                            # "(len(entire_descriptions) - len of sequence)", 
-                            
-                            # 6 (num of events in list) - 2 (max # of events in
-                                # individual sequence) = 4 (num of interations)
-                        # will complete 4 iterations to find the sequences for
-                            # those six numbers
-                            # iterations = (event1,event2), (event2,event3) ...
-                                            # iteration 0         iteration 1
-                                            # (since start_point
-                                                # is 0)
-                        # (will end at finding (event 5, event 6) since length
-                            # of list is 6 and next iteration would be 
-                            # (event6, event7) which does not exist)
-            for start_point in range(0, len(entire_descriptions) -
-                                     len_of_sequence):
-                
-                # need to put found sequences in tuples b/c tuples allow to use
-                    # the sequences as keys in the "count" dictionary (which 
-                    # then allows to look up number of occurences per sequence)
-                #"[start_point:start_point + len_of_sequence]" - if start_point
-                    # = 0, and len_of_sequence = 2, this determines the limit of
-                    # the number of elements in the sequence we are looking at
-                individual_sequence = tuple(entire_descriptions
-                                    [start_point:start_point + len_of_sequence])
-                                    # from eg: [0: 0 + 2]
-                                    # start at index 0 and go through events
-                                    # within range, excluding the endpoint/event
-                                    # which we don't want to count
-                                        # eg: event1, event2, event3
-                                        # counts (event1, event2) but not event3
-                                        #       (index0, index1)        (index2)
-                
-                
-                # if that sequence already exists as a key, then add 1 to the
-                    # current number of occurences
-                    # (eg: if "event1, event 2" is not a key)
-                if individual_sequence in count:
-                    count[individual_sequence] += 1
-                # if the sequence does not exist as a key yet, set the number of
-                    # times it has occured to one
-                    # (initalizes it/the count)
-                else:
-                    count[individual_sequence] = 1
-
-            # "count.items()" - allows iteration over keys/val in "count" dict
-            # "lambda x: x[1]" - looking at first index/sorting by number of
-                # occurrences (index 0 = sequence itself)
-            # "reverse = True" - sorts from descending order (most common 
-                # sequences at top)
-        ordered_sequences = sorted(count.items(), key=lambda x: x[1], reverse=True)
-        
-            # getting the top three most common sequences using slicing; gets
-                # everything before the third index
-                # (meaning everything before the fourth most common sequence
-                # since indexes start at 0)
-        most_common_sequences = ordered_sequences[:3]
+        # counting every sequence of every length is O(n^3), so the work is
+            # handed to mine_sequences(), which only grows sequences that are
+            # already repeated (a sequence that occurs once can never be part
+            # of a longer repeated one)
+        most_common_sequences = [
+            (tuple(store.descriptions[code] for code in codes), num)
+            for codes, num in mine_sequences(
+                store.description_codes, max_length=max_length,
+                min_support=min_support, top_k=top_k
+            )
+        ]
 
 
-        result_heading = "Top 3 most common sequences:\n"
+        result_heading = (
+            "Most common sequences:\n" if top_k is None
+            else f"Top {top_k} most common sequences:\n"
+        )
         result_content = ""
         
         # for each key/value pairs for the top 3 most common sequences,
@@ -842,9 +5155,10 @@ class SystemEventsManager:
             # add those pairs to what we're going to be outputting
             result_content += f"{individual_sequence}: {num_occurences}\n"
 
-        end_result = print(result_heading + result_content)
+        if not quiet:
+            print(result_heading + result_content)
 
-        return end_result
+        return most_common_sequences
     
 
     def main_menu(self, file_path, path):
@@ -930,11 +5244,173 @@ class SystemEventsManager:
         elif function_choice == "7":
             self.activity(path) 
         elif function_choice == "8":
-            self.visualize_warning_patterns() 
+            self.warning_patterns_demo(file_path)
         else: 
             print("Please enter a valid function number\
                   (1, 2, 3, 4, 5, 6, 7, 8).")
 
+def read_event_records(stream, record_format="csv"):
+    """Reads events to add in bulk from CSV or JSON Lines text.
+
+    Args:
+        stream (file object): text stream to read from, e.g. sys.stdin.
+        record_format (str, optional): "csv" (with a header row) or "jsonl"
+            (one JSON object per line). Default is "csv".
+
+    Raises:
+        ValueError: If the format is unknown or a JSON line is invalid.
+
+    Returns:
+        list of dict: one dictionary per event, with the keys expected by
+            SystemEventsManager.add_events().
+    """
+    if record_format == "csv":
+        return list(csv.DictReader(stream))
+    if record_format == "jsonl":
+        return [json.loads(line) for line in stream if line.strip()]
+    raise ValueError(f"Unknown record format \"{record_format}\".")
+
+
+def event_record(line):
+    """Turns an event line into a dictionary for JSON output.
+
+    Args:
+        line (str): an event line of the log file.
+
+    Returns:
+        dict: the "timestamp", "category", "event_id" and "description" of
+            the event.
+    """
+    timestamp, category, event_id, description = _split_event_line(line)
+    return {"timestamp": timestamp, "category": category,
+            "event_id": event_id, "description": description}
+
+
+# commands of run_command() that work with a storage backend ("import"
+# always reads a text log)
+STORAGE_COMMANDS = ("summary", "activity", "search", "add", "import")
+
+
+def run_command(manager, args):
+    """Runs one of the non-interactive subcommands of parse_args().
+
+    Args:
+        manager (SystemEventsManager): the manager that runs the analysis.
+        args (namespace): the parsed command line arguments.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+        ValueError: If the command is unknown or an event to add is invalid.
+
+    Returns:
+        dict or list: the result of the command, ready for json.dumps().
+    """
+    if (manager.storage != "text"
+            and args.command not in STORAGE_COMMANDS):
+        raise ValueError(f"The {args.command} command needs --storage text.")
+    if args.command == "summary":
+        result = {"counts": manager.event_type_counts(args.file_name,
+                                                      SUMMARY_EVENTS)}
+        if args.review:
+            result["review"] = [
+                event_record(line) for line in
+                manager.review_events(args.file_name, args.review)
+            ]
+        if args.date:
+            month, day = args.date
+            result["time_frame_counts"] = manager.time_frame_counts(
+                args.file_name, month, day
+            )
+            result["time_frame"] = [
+                event_record(line) for line in
+                manager.date_events(args.file_name, month, day)
+            ]
+        return result
+    if args.command == "activity":
+        # JSON object keys are strings
+        return {str(month): count for month, count in
+                manager.month_counts(args.file_name).items()}
+    if args.command == "search":
+        return [event_record(line) for line in manager.search_events(
+            args.file_name, args.event_type, args.keyword
+        )]
+    if args.command == "sequences":
+        return [
+            {"sequence": list(sequence), "count": count}
+            for sequence, count in manager.event_sequence(
+                args.file_name, args.max_length, args.min_support,
+                args.top_k, quiet=True
+            )
+        ]
+    if args.command == "warning-patterns":
+        patterns = manager.id_warning_patterns(args.file_name,
+                                               args.pattern_length)
+        return [
+            {"pattern": [description for _, description in pattern],
+             "count": count}
+            for pattern, count in patterns.items()
+        ]
+    if args.command == "add":
+        new_ids = manager.add_events(
+            args.file_name, read_event_records(sys.stdin, args.format),
+            args.change_log, args.use_sidecar, args.sync
+        )
+        return {"added": new_ids}
+    if args.command == "rollup":
+        return manager.build_rollups(args.files or [args.file_name])
+    if args.command == "import":
+        return {"imported": manager.import_log(
+            args.file_name, args.database, args.change_log
+        ), "database": args.database}
+    if args.command == "report":
+        return manager.render_reports(
+            args.files or [args.file_name], args.output_dir, args.formats,
+            args.pattern_length, args.top
+        )
+    if args.command == "follow":
+        import asyncio
+
+        monitor = WarningAlertMonitor(args.pattern_length, args.threshold)
+        try:
+            asyncio.run(manager.follow(
+                args.file_name, monitor,
+                lambda alert: print(json.dumps(alert), flush=True),
+                args.poll_interval, args.from_end
+            ))
+        except KeyboardInterrupt:
+            pass
+        # the totals when following was stopped
+        totals = monitor.totals
+        return {
+            "counts": count_event_types(totals.pair_counts, SUMMARY_EVENTS),
+            "activity": {str(month): totals.month_counts[month]
+                         for month in sorted(totals.month_counts)},
+        }
+    raise ValueError(f"Unknown command \"{args.command}\".")
+
+
+def run_cli(manager, args):
+    """Runs the command chosen on the command line: the interactive menu,
+    or a command whose result is printed as JSON.
+
+    Args:
+        manager (SystemEventsManager): the manager that runs the analysis.
+        args (namespace): the parsed command line arguments.
+
+    Side effects:
+        Exits with an error message if the file is not found or the input
+            is invalid.
+    """
+    if args.command == "menu":
+        manager.main_menu(args.file_name, args.file_name)
+        return
+    try:
+        result = run_command(manager, args)
+    except (OSError, ValueError) as error:
+        sys.exit(f"Error: {error}")
+    print(json.dumps(result, indent=2))
+
+
 def parse_args(arglist):
     """Processes command line arguments. 
             Primary author of function: Christie Cao
@@ -946,13 +5422,185 @@ def parse_args(arglist):
     Returns:
         namespace: the parsed arguments as a namespace.
     """
-    parser = ArgumentParser()
-    parser.add_argument("file_name", help="file containing the system events")
-    return parser.parse_args(arglist)
+    parser = ArgumentParser(
+        description="Analyze a system events file. The menu command "
+                    "(the default) is interactive; the other commands print "
+                    "JSON. Options go before the file name.",
+        exit_on_error=False
+    )
+    parser.add_argument("file_name", nargs="?",
+                        default="spring2024_system_events.txt",
+                        help="file containing the system events")
+    parser.add_argument("--streaming", action="store_true",
+                        help="stream the file instead of loading it")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes used for large files")
+    parser.add_argument("--engine",
+                        choices=["store", "c", "pyarrow", "mmap"],
+                        default="store",
+                        help="parser used for the summary/activity counts")
+    parser.add_argument("--cache", choices=["stat", "hash", "none"],
+                        default="stat",
+                        help="how the cache of parsed events is checked")
+    parser.add_argument("--rollups", action="store_true",
+                        help="read the counts from the rollups kept next "
+                             "to the file")
+    parser.add_argument("--storage", choices=["text"] + list(STORAGE_BACKENDS),
+                        default="text",
+                        help="where the events are kept; with sqlite the "
+                             "file name is a database made by the import "
+                             "command")
+    parser.add_argument("--metrics", default=None, metavar="PATH",
+                        help="record timings and counters of every analysis "
+                             "method in this file")
+    parser.add_argument("--metrics-format", choices=["json", "prometheus"],
+                        default="json",
+                        help="JSON Lines records or Prometheus text format")
+    parser.add_argument("--profile", choices=["cpu", "memory"],
+                        default=None,
+                        help="run under cProfile or tracemalloc")
+    parser.add_argument("--profile-output", default="profile.txt",
+                        help="file for the profile report")
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser(
+        "menu", help="choose an analysis interactively (default)"
+    )
+
+    summary_parser = subparsers.add_parser(
+        "summary", help="count the events of each type"
+    )
+    summary_parser.add_argument("--review", metavar="EVENT_TYPE",
+                                help="also list the events of this type")
+    summary_parser.add_argument("--date", type=int, nargs=2,
+                                metavar=("MONTH", "DAY"),
+                                help="also list the events on this day")
+
+    subparsers.add_parser(
+        "activity", help="count the events of each month"
+    )
+
+    search_parser = subparsers.add_parser(
+        "search", help="find events of a type by keyword"
+    )
+    search_parser.add_argument("event_type",
+                               help="event type, e.g. Error or Warning")
+    search_parser.add_argument("keyword",
+                               help="text the description has to contain")
+
+    sequences_parser = subparsers.add_parser(
+        "sequences", help="find the most common sequences of events"
+    )
+    sequences_parser.add_argument("--max-length", type=int, default=10,
+                                  help="longest sequence to look for")
+    sequences_parser.add_argument("--min-support", type=int, default=2,
+                                  help="minimum number of occurrences")
+    sequences_parser.add_argument("--top-k", type=int, default=3,
+                                  help="number of sequences to report")
+
+    patterns_parser = subparsers.add_parser(
+        "warning-patterns", help="find repeated patterns of warnings"
+    )
+    patterns_parser.add_argument("--pattern-length", type=int, default=3,
+                                 help="number of warnings in a pattern")
+
+    add_parser = subparsers.add_parser(
+        "add", help="add events in bulk from CSV or JSON Lines on stdin"
+    )
+    add_parser.add_argument("--format", choices=["csv", "jsonl"],
+                            default="csv", help="format of the input")
+    add_parser.add_argument("--change-log", default=None,
+                            help="file where the changes are recorded")
+    add_parser.add_argument("--use-sidecar", action="store_true",
+                            help="keep the last event ID in a sidecar file")
+    add_parser.add_argument("--sync", action="store_true",
+                            help="flush the events to disk before exiting")
+
+    rollup_parser = subparsers.add_parser(
+        "rollup", help="build the per-day, per-hour and per-type counts "
+                       "read with --rollups"
+    )
+    rollup_parser.add_argument("--files", nargs="+", default=None,
+                               metavar="FILE",
+                               help="build the rollups of a batch of log "
+                                    "files instead of the file name")
+
+    import_parser = subparsers.add_parser(
+        "import", help="copy the events of the file into a new SQLite "
+                       "database, read with --storage sqlite"
+    )
+    import_parser.add_argument("database", help="path to the database")
+    import_parser.add_argument("--change-log", default=None,
+                               help="also copy the entries of this change "
+                                    "log")
+
+    report_parser = subparsers.add_parser(
+        "report", help="write the activity and warning charts to image "
+                       "files, without a display"
+    )
+    report_parser.add_argument("output_dir",
+                               help="directory the charts are written to")
+    report_parser.add_argument("--formats", nargs="+", default=["png"],
+                               choices=["png", "svg"],
+                               help="image formats of the charts")
+    report_parser.add_argument("--files", nargs="+", default=None,
+                               metavar="FILE",
+                               help="render a batch of log files instead "
+                                    "of the file name")
+    report_parser.add_argument("--pattern-length", type=int, default=3,
+                               help="number of warnings in a pattern")
+    report_parser.add_argument("--top", type=int, default=20,
+                               help="number of warning patterns drawn")
+
+    follow_parser = subparsers.add_parser(
+        "follow", help="watch the file and print an alert (JSON line) when "
+                       "a warning pattern becomes frequent"
+    )
+    follow_parser.add_argument("--threshold", type=int, default=5,
+                               help="occurrences that raise an alert")
+    follow_parser.add_argument("--pattern-length", type=int, default=3,
+                               help="number of warnings in a pattern")
+    follow_parser.add_argument("--poll-interval", type=float, default=0.5,
+                               help="seconds between checks of the file")
+    follow_parser.add_argument("--from-end", action="store_true",
+                               help="only count events appended from now on")
+
+    try:
+        args = parser.parse_args(arglist)
+    except ArgumentError as error:
+        if error.argument_name != "command":
+            parser.error(str(error))
+        # argparse fills the positionals in order, so a file name given
+        # without a command is taken for the command; if that is what
+        # happened, the file name parses once the default command follows it
+        try:
+            args = parser.parse_args(list(arglist) + ["menu"])
+        except ArgumentError as error:
+            parser.error(str(error))
+    if args.command is None:
+        args.command = "menu"
+    return args
 
 if __name__ == "__main__":
-    file_path = "spring2024_system_events.txt"
-    path = "spring2024_system_events.txt"
+    args = parse_args(sys.argv[1:])
+
+    instrumentation = None
+    if args.metrics:
+        sink = (PrometheusFileSink(args.metrics)
+                if args.metrics_format == "prometheus"
+                else JsonFileSink(args.metrics))
+        instrumentation = Instrumentation([sink])
 
-    example = SystemEventsManager()
-    example.main_menu(file_path, path)
\ No newline at end of file
+    example = SystemEventsManager(streaming=args.streaming,
+                                  csv_engine=args.engine,
+                                  workers=args.workers,
+                                  cache=None if args.cache == "none"
+                                  else args.cache,
+                                  instrumentation=instrumentation,
+                                  rollups=args.rollups,
+                                  storage=args.storage)
+    if args.profile:
+        profile_call(lambda: run_cli(example, args), args.profile,
+                     args.profile_output)
+    else:
+        run_cli(example, args)
@@ -0,0 +1,38 @@
+import importlib.util
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULE_PATH = ROOT / "system-events-functions.py"
+SAMPLE_LOG = ROOT / "spring2024_system_events.txt"
+
+
+def load_module():
+    """Imports system-events-functions.py (its file name is not a valid
+    module name) and returns it."""
+    if "system_events" in sys.modules:
+        return sys.modules["system_events"]
+    spec = importlib.util.spec_from_file_location("system_events",
+                                                  MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # registered first, so worker processes can unpickle the module's
+    # functions by name
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def events_module():
+    return load_module()
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """A copy of the sample log that a test can append to."""
+    path = tmp_path / "events.txt"
+    shutil.copyfile(SAMPLE_LOG, path)
+    return str(path)
@@ -0,0 +1,41 @@
+import pytest
+
+
+def make_event(date="03152024", time="1430", **fields):
+    event = {"date": date, "time": time, "category": "Error",
+             "priority": "High", "description": "Disk failure",
+             "user_name": "tester"}
+    event.update(fields)
+    return event
+
+
+@pytest.mark.parametrize("date", ["13452024", "00152024", "02302024",
+                                  "02292023", "04312024"])
+def test_validate_event_rejects_impossible_dates(events_module, date):
+    with pytest.raises(ValueError, match="INVALID DATE"):
+        events_module.validate_event(make_event(date=date))
+
+
+def test_validate_event_accepts_leap_day(events_module):
+    validated = events_module.validate_event(make_event(date="02292024",
+                                                        time="2359"))
+    assert validated[0] == "2024-02-29 23:59:00"
+
+
+def test_invalid_date_rejects_the_whole_batch(events_module, log_file,
+                                              tmp_path):
+    change_log = tmp_path / "changes.txt"
+    with open(log_file, "rb") as file:
+        before = file.read()
+
+    manager = events_module.SystemEventsManager()
+    with pytest.raises(ValueError, match="Event 2"):
+        manager.add_events(log_file, [make_event(),
+                                      make_event(date="13452024")],
+                           change_log_file=str(change_log))
+
+    with open(log_file, "rb") as file:
+        assert file.read() == before
+    assert not change_log.exists()
+    # the analyses still read the log
+    assert len(manager.load_events(log_file)) == 500
@@ -0,0 +1,31 @@
+import pytest
+
+DEFAULT_FILE = "spring2024_system_events.txt"
+
+
+@pytest.mark.parametrize("arglist, file_name, command", [
+    ([], DEFAULT_FILE, "menu"),
+    (["events.txt"], "events.txt", "menu"),
+    (["events.txt", "menu"], "events.txt", "menu"),
+    (["summary"], DEFAULT_FILE, "summary"),
+    (["events.txt", "summary"], "events.txt", "summary"),
+    # option values and command arguments that are also command names
+    (["--profile-output", "summary", "events.txt"], "events.txt", "menu"),
+    (["events.txt", "search", "Error", "summary"], "events.txt", "search"),
+])
+def test_parse_args_defaults_to_the_menu(events_module, arglist, file_name,
+                                         command):
+    args = events_module.parse_args(arglist)
+    assert (args.file_name, args.command) == (file_name, command)
+
+
+@pytest.mark.parametrize("arglist", [
+    ["events.txt", "summry"],
+    ["--workers", "many", "events.txt"],
+])
+def test_parse_args_reports_invalid_arguments(events_module, capsys,
+                                              arglist):
+    with pytest.raises(SystemExit) as exit_info:
+        events_module.parse_args(arglist)
+    assert exit_info.value.code == 2
+    assert "error: argument" in capsys.readouterr().err
@@ -0,0 +1,79 @@
+import multiprocessing
+import threading
+
+import pytest
+
+from conftest import load_module
+
+PROCESSES = 4
+THREADS = 4
+BATCHES = 3
+BATCH_SIZE = 5
+
+
+def make_event(producer, number):
+    return {"date": "05012024", "time": "1200", "category": "Warning",
+            "priority": "Low",
+            "description": f"Concurrent append {producer}-{number}",
+            "user_name": "tester"}
+
+
+def add_batches(log_file, change_log, use_sidecar, producer):
+    """Adds BATCHES batches with add_events() (run in another process)."""
+    manager = load_module().SystemEventsManager()
+    for batch in range(BATCHES):
+        manager.add_events(
+            log_file,
+            [make_event(producer, batch * BATCH_SIZE + number)
+             for number in range(BATCH_SIZE)],
+            change_log_file=change_log, use_sidecar=use_sidecar
+        )
+
+
+def submit_events(appender, producer, ids):
+    futures = [appender.submit(make_event(producer, number))
+               for number in range(BATCHES * BATCH_SIZE)]
+    ids.extend(future.result() for future in futures)
+
+
+@pytest.mark.parametrize("use_sidecar", [False, True])
+def test_concurrent_appends_get_unique_numbers(events_module, log_file,
+                                               tmp_path, use_sidecar):
+    change_log = str(tmp_path / "changes.txt")
+    processes = [
+        multiprocessing.Process(target=add_batches,
+                                args=(log_file, change_log, use_sidecar,
+                                      f"process{producer}"))
+        for producer in range(PROCESSES)
+    ]
+    appended_ids = []
+    with events_module.GroupCommitAppender(
+        log_file, interval=0.001, change_log_file=change_log,
+        use_sidecar=use_sidecar
+    ) as appender:
+        threads = [
+            threading.Thread(target=submit_events,
+                             args=(appender, f"thread{producer}",
+                                   appended_ids))
+            for producer in range(THREADS)
+        ]
+        for worker in processes + threads:
+            worker.start()
+        for worker in processes + threads:
+            worker.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    added = (PROCESSES + THREADS) * BATCHES * BATCH_SIZE
+    with open(log_file, "r", encoding="utf-8") as file:
+        ids = [line.split(" | ")[2] for line in file]
+    # the sample log ends with ID500
+    assert len(ids) == 500 + added
+    assert [events_module.parse_event_id(event_id)
+            for event_id in ids[500:]] == list(range(501, 501 + added))
+    # every event submitted to the appender got its own ID
+    assert len(set(appended_ids)) == THREADS * BATCHES * BATCH_SIZE
+    assert set(appended_ids) <= set(ids[500:])
+
+    with open(change_log, "r", encoding="utf-8") as file:
+        numbers = [events_module._change_log_number(line) for line in file]
+    assert numbers == list(range(1, added + 1))
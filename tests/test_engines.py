@@ -0,0 +1,73 @@
+import pytest
+
+# lines that are not events, or that break a split on '|'
+ODD_LINES = [
+    '2024-02-03 04:05:06 | Error | ID900 | Copy a | b failed "quoted',
+    "2024-02-03 04:05:07 | Warning | ID901 | NA",
+    "2024-02-03 04:05:08 | Update | ID902 | ",
+    "2024-13-03 04:05:06 | Error | ID903 | month 13",
+    "2024-02-30 04:05:06 | Error | ID904 | February 30",
+    "2024-02-03 24:05:06 | Error | ID905 | hour 24",
+    "2024-02-03 04:05:06 | Error | IDx | not a number",
+    "2024-02-03 04:05:06 |Error | ID906 | no space before the category",
+    "2024-02-03 04:05:06 | | ID907 | separators sharing a space",
+    "2024-02-03 04:05:06 | Error | ID908 |",
+    '"2024-02-03 04:05:06 | Error | ID909 | quote in front',
+    "short | line",
+    "",
+]
+
+def engines():
+    """The pandas engines of read_event_frame() that are installed."""
+    names = ["c"]
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        names.append("pyarrow")
+    return names
+
+
+@pytest.fixture(params=[False, True], ids=["three-pipes", "more-pipes"])
+def odd_log(request, tmp_path, log_file):
+    """The sample log with ODD_LINES in the middle; with more-pipes, one of
+    them has a '|' in its description."""
+    odd_lines = ODD_LINES if request.param else ODD_LINES[1:]
+    with open(log_file, "r", encoding="utf-8") as file:
+        lines = file.read().splitlines()
+    path = tmp_path / "odd.txt"
+    path.write_text("\n".join(lines[:250] + odd_lines + lines[250:]) + "\n",
+                    encoding="utf-8")
+    return str(path)
+
+
+def store_events(events_module, path):
+    store = events_module.EventStore.from_file(path)
+    return [(events_module.format_timestamp(store.timestamps[row]),
+             store.categories[store.category_codes[row]], store.ids[row],
+             store.descriptions[store.description_codes[row]])
+            for row in range(len(store))]
+
+
+@pytest.mark.parametrize("engine", engines())
+def test_frame_has_the_events_of_the_store(events_module, odd_log, engine):
+    frame = events_module.read_event_frame(
+        odd_log, engine,
+        columns=("timestamp", "category", "event_id", "description")
+    )
+    events = [(str(row.timestamp), row.category, row.event_id,
+               row.description) for row in frame.itertuples()]
+    assert events == store_events(events_module, odd_log)
+
+
+@pytest.mark.parametrize("engine", engines())
+def test_engines_count_the_same_events(events_module, odd_log, engine):
+    event_types = events_module.SUMMARY_EVENTS
+    store = events_module.SystemEventsManager()
+    frame = events_module.SystemEventsManager(csv_engine=engine)
+    streaming = events_module.SystemEventsManager(streaming=True)
+
+    expected = store.event_type_counts(odd_log, event_types)
+    assert frame.event_type_counts(odd_log, event_types) == expected
+    assert streaming.event_type_counts(odd_log, event_types) == expected
@@ -0,0 +1,41 @@
+import json
+import subprocess
+import sys
+
+from conftest import MODULE_PATH
+
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib"]
+
+
+def import_side_effects():
+    """Imports the module in a fresh interpreter and returns what the import
+    touched besides the interpreter's own modules: the heavy modules it
+    loaded and the files it opened that are not Python modules (e.g. event
+    logs or a matplotlib backend's resources)."""
+    code = (
+        "import importlib.util, json, sys\n"
+        "opened = []\n"
+        "def audit(event, arguments):\n"
+        "    if event == 'open' and isinstance(arguments[0], str):\n"
+        "        opened.append(arguments[0])\n"
+        "sys.addaudithook(audit)\n"
+        "spec = importlib.util.spec_from_file_location("
+        f"'system_events', {str(MODULE_PATH)!r})\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        f"loaded = [name for name in {HEAVY_MODULES!r} "
+        "if name in sys.modules]\n"
+        "print(json.dumps([loaded, opened]))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code],
+                            capture_output=True, text=True, check=True)
+    loaded, opened = json.loads(result.stdout)
+    opened = [path for path in opened
+              if not path.endswith((".py", ".pyc", ".so"))]
+    return loaded, opened
+
+
+def test_import_has_no_side_effects():
+    loaded, opened = import_side_effects()
+    assert loaded == []
+    assert opened == []
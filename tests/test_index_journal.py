@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+
+def add_batches(events_module, log_file, tmp_path, batches):
+    manager = events_module.SystemEventsManager(rollups=True)
+    manager.load_index(log_file)
+    for batch in range(batches):
+        manager.add_events(log_file, [
+            {"date": "05012024", "time": f"{batch % 24:02}00",
+             "category": "Warning", "priority": "Low",
+             "description": f"Journal test word{batch} disk",
+             "user_name": "tester"},
+        ], change_log_file=str(tmp_path / "changes.txt"))
+    return manager
+
+
+def assert_same_index(loaded, built):
+    assert loaded.indexed_size == built.indexed_size
+    assert loaded.offsets == built.offsets
+    assert loaded.postings == built.postings
+    assert loaded.category_postings == built.category_postings
+
+
+@pytest.mark.parametrize("journal_limit", [100, 3])
+def test_appends_are_journaled_and_replayed(events_module, log_file,
+                                            tmp_path, monkeypatch,
+                                            journal_limit):
+    index_class = events_module.InvertedIndex
+    monkeypatch.setattr(index_class, "journal_limit", journal_limit)
+    add_batches(events_module, log_file, tmp_path, 7)
+
+    journal = index_class.journal_path(log_file)
+    with open(journal, "r", encoding="utf-8") as file:
+        entries = len(file.readlines())
+    # the index was saved in full first, and again every journal_limit
+    # entries
+    assert entries == 7 % (journal_limit + 1)
+
+    loaded, changed = index_class.load(log_file)
+    assert not changed
+    built = index_class(log_file)
+    built.refresh()
+    assert_same_index(loaded, built)
+    assert loaded.find("word6", "warn") == built.find("word6", "warn")
+
+
+def test_stale_journal_entries_are_skipped(events_module, log_file,
+                                           tmp_path):
+    index_class = events_module.InvertedIndex
+    add_batches(events_module, log_file, tmp_path, 2)
+    # an entry that does not continue from the saved state, e.g. written
+    # by another process from an older one, and a line cut short
+    journal = index_class.journal_path(log_file)
+    with open(journal, "r", encoding="utf-8") as file:
+        first_entry = file.readline()
+    with open(journal, "a", encoding="utf-8") as file:
+        file.write(first_entry + '{"start": [1')
+
+    loaded, _ = index_class.load(log_file)
+    built = index_class(log_file)
+    built.refresh()
+    assert_same_index(loaded, built)
+
+
+def test_rollups_still_replay_their_journal(events_module, log_file,
+                                            tmp_path):
+    add_batches(events_module, log_file, tmp_path, 3)
+    assert os.path.exists(events_module.RollupIndex.journal_path(log_file))
+
+    loaded, changed = events_module.RollupIndex.load(log_file)
+    assert not changed
+    built = events_module.RollupIndex(log_file)
+    built.refresh()
+    assert loaded.category_counts() == built.category_counts()
+    assert loaded.day_counts() == built.day_counts()
@@ -0,0 +1,62 @@
+import pytest
+
+from conftest import SAMPLE_LOG
+
+WORKERS = 3
+# small enough that every worker reads its range in several chunks
+CHUNK_SIZE = 4096
+
+
+@pytest.fixture(scope="module")
+def big_log(tmp_path_factory):
+    """The sample log repeated, so that it splits into several ranges."""
+    path = tmp_path_factory.mktemp("parallel") / "events.txt"
+    text = SAMPLE_LOG.read_text(encoding="utf-8")
+    path.write_text(text * 20, encoding="utf-8")
+    return str(path)
+
+
+def totals(aggregator):
+    return (aggregator.events, aggregator.pair_counts,
+            aggregator.month_counts, aggregator.date_counts,
+            aggregator.hour_counts, aggregator.warning_patterns,
+            aggregator.warnings_seen)
+
+
+def test_parallel_aggregate_matches_serial(events_module, big_log):
+    serial = events_module.EventAggregator()
+    for fields in events_module.iter_events(big_log, CHUNK_SIZE):
+        serial.update(*fields)
+
+    parallel = events_module.parallel_aggregate(big_log, WORKERS,
+                                                chunk_size=CHUNK_SIZE)
+    assert totals(parallel) == totals(serial)
+
+
+def test_parallel_extraction_matches_serial(events_module, big_log):
+    date_times = list(events_module.iter_date_times(big_log, CHUNK_SIZE))
+    assert events_module.parallel_date_times(
+        big_log, WORKERS, CHUNK_SIZE
+    ) == date_times
+
+    timestamps = events_module.extract_timestamps(big_log, CHUNK_SIZE)
+    assert events_module.parallel_timestamps(
+        big_log, WORKERS, CHUNK_SIZE
+    ).tolist() == timestamps.tolist()
+
+
+def test_manager_with_workers_matches_serial(events_module, big_log):
+    serial = events_module.SystemEventsManager()
+    parallel = events_module.SystemEventsManager(workers=WORKERS,
+                                                 chunk_size=CHUNK_SIZE)
+    event_types = events_module.SUMMARY_EVENTS
+
+    assert parallel.event_type_counts(
+        big_log, event_types
+    ) == serial.event_type_counts(big_log, event_types)
+    assert parallel.id_warning_patterns(
+        big_log
+    ) == serial.id_warning_patterns(big_log)
+    assert parallel.extract_date_time(
+        big_log, quiet=True
+    ) == serial.extract_date_time(big_log, quiet=True)
@@ -0,0 +1,60 @@
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from conftest import SAMPLE_LOG
+
+
+def baseline_sequences(path, max_length=10):
+    """The top 3 sequences the way the original event_sequence() found them:
+    the description after the last '|' of every line, every run counted
+    with a dictionary and a stable sort by count. The original went up to
+    every length; longer runs never occur more often than the runs they
+    start with, so stopping at max_length does not change the top 3."""
+    descriptions = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            match = re.search(r"([^|]+)$", line)
+            if match:
+                descriptions.append(match.group(0).strip())
+    count = {}
+    for length in range(2, min(len(descriptions), max_length + 1)):
+        for start in range(0, len(descriptions) - length):
+            sequence = tuple(descriptions[start:start + length])
+            count[sequence] = count.get(sequence, 0) + 1
+    return sorted(count.items(), key=lambda x: x[1], reverse=True)[:3]
+
+
+def test_event_sequence_matches_the_baseline(events_module, capsys):
+    manager = events_module.SystemEventsManager()
+    expected = baseline_sequences(SAMPLE_LOG)
+
+    assert manager.event_sequence(str(SAMPLE_LOG)) == expected
+    printed = capsys.readouterr().out
+    assert printed == "Top 3 most common sequences:\n" + "".join(
+        f"{sequence}: {num}\n" for sequence, num in expected
+    ) + "\n"
+
+
+def naive_sequences(items, max_length, min_support):
+    count = Counter()
+    first = {}
+    for length in range(2, max_length + 1):
+        for start in range(len(items) - length + 1):
+            run = tuple(items[start:start + length])
+            count[run] += 1
+            first.setdefault(run, start)
+    runs = [(run, num) for run, num in count.items() if num >= min_support]
+    return sorted(runs, key=lambda x: (-x[1], len(x[0]), first[x[0]]))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_mine_sequences_counts_every_run(events_module, seed):
+    rng = random.Random(seed)
+    items = [rng.choice("abcd") for _ in range(300)]
+
+    mined = events_module.mine_sequences(items, max_length=6, min_support=2,
+                                         top_k=None)
+    assert mined == naive_sequences(items, 6, 2)